@@ -5,10 +5,16 @@ Replaces SQLite with Supabase for subscriber management
 """
 
 import os
+import sys
+import csv
+import time
+import asyncio
 import logging
-from datetime import datetime
-from typing import List, Optional
-from supabase import create_client, Client
+import threading
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+import httpx
+from postgrest.exceptions import APIError
+from supabase import create_client, Client, ClientOptions, acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -16,6 +22,170 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Credentials are resolved once at import; missing values are reported when a client is created
+SUPABASE_URL = os.getenv('SUPABASE_URL')
+SUPABASE_SERVICE_ROLE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY')  # Use service role for server operations
+
+# Postgres error codes surfaced by PostgREST as APIError.code
+PG_UNIQUE_VIOLATION = '23505'
+PG_INSUFFICIENT_PRIVILEGE = '42501'
+PGRST_FUNCTION_NOT_FOUND = 'PGRST202'
+
+# Seconds before a PostgREST request is abandoned
+DB_REQUEST_TIMEOUT = 10
+
+# Retry transient failures with exponential backoff (0.1s, 0.2s, ... capped at 2s)
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.1
+RETRY_MAX_DELAY = 2.0
+
+# Stop calling Supabase for a while after repeated failures
+BREAKER_FAIL_MAX = 5
+BREAKER_RESET_TIMEOUT = 30
+
+# Gateway statuses PostgREST reports as APIError.code when the body isn't JSON
+TRANSIENT_HTTP_STATUSES = {502, 503, 504, 520}
+
+# Schema for the subscriber table - run in Supabase Dashboard > SQL Editor
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS ma_subscribers (
+    id BIGSERIAL PRIMARY KEY,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    date_joined TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    verified BOOLEAN DEFAULT TRUE,
+    unsubscribed BOOLEAN NOT NULL DEFAULT FALSE,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Partial index over active subscribers only; INCLUDE (email) lets the
+-- subscriber list and count queries run as index-only scans
+CREATE INDEX IF NOT EXISTS ma_subscribers_active_idx
+    ON ma_subscribers (id) INCLUDE (email)
+    WHERE unsubscribed = false;
+
+-- Enable Row Level Security
+ALTER TABLE ma_subscribers ENABLE ROW LEVEL SECURITY;
+
+-- Create policies for service role access
+CREATE POLICY "Service role can do anything" ON ma_subscribers
+    FOR ALL USING (auth.role() = 'service_role');
+
+-- Normalize emails at write time so lookups hit the plain unique index
+CREATE OR REPLACE FUNCTION ma_subscribers_normalize_email() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.email := lower(btrim(NEW.email));
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ma_subscribers_normalize_email ON ma_subscribers;
+CREATE TRIGGER ma_subscribers_normalize_email
+    BEFORE INSERT OR UPDATE OF email ON ma_subscribers
+    FOR EACH ROW EXECUTE FUNCTION ma_subscribers_normalize_email();
+
+-- Collapse addresses that differ only by case/whitespace before normalizing,
+-- otherwise the UPDATE below hits the unique index. The oldest row is kept
+-- and inherits an unsubscribe from any of its duplicates
+UPDATE ma_subscribers a SET unsubscribed = TRUE
+    FROM ma_subscribers b
+    WHERE lower(btrim(a.email)) = lower(btrim(b.email)) AND a.id < b.id
+      AND b.unsubscribed AND NOT a.unsubscribed;
+DELETE FROM ma_subscribers a
+    USING ma_subscribers b
+    WHERE lower(btrim(a.email)) = lower(btrim(b.email)) AND a.id > b.id;
+
+UPDATE ma_subscribers SET email = lower(btrim(email)) WHERE email <> lower(btrim(email));
+ALTER TABLE ma_subscribers DROP CONSTRAINT IF EXISTS ma_subscribers_email_normalized;
+ALTER TABLE ma_subscribers ADD CONSTRAINT ma_subscribers_email_normalized
+    CHECK (email = lower(btrim(email)));
+
+-- Active subscriber count as an RPC (called by get_subscriber_count)
+CREATE OR REPLACE FUNCTION ma_active_subscriber_count() RETURNS bigint
+LANGUAGE sql STABLE AS $$
+    SELECT count(*) FROM ma_subscribers WHERE NOT unsubscribed
+$$;
+
+-- One hash shard of the active subscribers (called by get_subscriber_shard)
+CREATE OR REPLACE FUNCTION get_mailer_batch(shard int, n int) RETURNS TABLE(email text)
+LANGUAGE sql STABLE AS $$
+    SELECT email FROM ma_subscribers
+    WHERE NOT unsubscribed AND mod(abs(hashtext(email)::bigint), n) = shard
+$$;
+"""
+
+def _parse_csv_rows(body) -> List[List[str]]:
+    """
+    Split a PostgREST text/csv body into rows, dropping the header line
+    Plain split is enough for id/email columns; fall back to csv only if
+    PostgREST had to quote a field
+    """
+    if not body or not isinstance(body, str):
+        return []
+    if '"' in body:
+        return list(csv.reader(body.splitlines()))[1:]
+    return [line.split(',', 1) for line in body.splitlines()[1:]]
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling Supabase while the circuit breaker is open"""
+
+
+def _is_transient(error: Exception) -> bool:
+    """Network errors and gateway 5xx responses are worth retrying"""
+    if isinstance(error, httpx.HTTPError):
+        return True
+    return isinstance(error, APIError) and error.code in TRANSIENT_HTTP_STATUSES
+
+
+class _CircuitBreaker:
+    """
+    Retry policy and circuit breaker shared by the sync and async clients
+    State is guarded by a lock so one client can be used from several threads
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def check(self):
+        """Raise CircuitOpenError while Supabase is being skipped"""
+        with self._lock:
+            if time.monotonic() < self._open_until:
+                raise CircuitOpenError("Supabase circuit breaker is open, skipping request")
+
+    def record_success(self):
+        """Reset the failure streak after a successful request"""
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide what to do after a failed attempt
+
+        Args:
+            error: The exception the attempt raised
+            attempt: Zero-based attempt number
+
+        Returns:
+            Seconds to wait before retrying, or None if the error should be raised
+            (not transient, or retries are exhausted - which counts towards the breaker)
+        """
+        if not _is_transient(error):
+            return None
+        if attempt == RETRY_ATTEMPTS - 1:
+            with self._lock:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= BREAKER_FAIL_MAX:
+                    self._open_until = time.monotonic() + BREAKER_RESET_TIMEOUT
+                    logger.error("❌ Supabase failing repeatedly, pausing requests for %ds", BREAKER_RESET_TIMEOUT)
+            return None
+        delay = min(RETRY_BASE_DELAY * 2 ** attempt, RETRY_MAX_DELAY)
+        logger.debug("Transient Supabase error (%s), retrying in %.1fs", error, delay)
+        return delay
+
+
 class MASupabaseDB:
     """
     M&A Newsletter Supabase Database Manager
@@ -24,56 +194,91 @@ class MASupabaseDB:
     
     def __init__(self):
         """Initialize Supabase client"""
-        self.supabase_url = os.getenv('SUPABASE_URL')
-        self.supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')  # Use service role for server operations
+        self.supabase_url = SUPABASE_URL
+        self.supabase_key = SUPABASE_SERVICE_ROLE_KEY
         
         if not self.supabase_url or not self.supabase_key:
             raise ValueError(
                 "Missing Supabase credentials. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables."
             )
         
+        # Persistent keep-alive pool so repeat queries skip the TCP+TLS handshake.
+        # Timeout lives on the httpx client (PostgREST ignores its own when one is supplied).
+        self.http_client = httpx.Client(
+            timeout=httpx.Timeout(DB_REQUEST_TIMEOUT),
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+        )
+        options = ClientOptions(schema='public', httpx_client=self.http_client)
+        
         try:
-            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
+            self.supabase: Client = create_client(self.supabase_url, self.supabase_key, options=options)
             logger.info("✅ Connected to Supabase database")
         except Exception as e:
-            logger.error(f"❌ Failed to connect to Supabase: {e}")
+            logger.error("❌ Failed to connect to Supabase: %s", e)
             raise
+
+        # In-process TTL cache for subscriber list/count (they change rarely)
+        self.cache_ttl = int(os.getenv('SUBSCRIBER_CACHE_TTL', '1800'))
+        self._cache: Dict[str, Tuple[float, Any]] = {}
+
+        self._breaker = _CircuitBreaker()
+
+    def _execute(self, query):
+        """
+        Execute a PostgREST query, retrying transient failures with backoff
+        
+        Raises:
+            CircuitOpenError: Supabase failed repeatedly and is being skipped
+            Exception: The last error once retries are exhausted
+        """
+        self._breaker.check()
+
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                response = query.execute()
+            except Exception as e:
+                delay = self._breaker.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+            else:
+                self._breaker.record_success()
+                return response
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        """Return a cached value if it hasn't expired yet"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return None
+        return value
+
+    def _cache_set(self, key: str, value: Any):
+        """Store a value in the cache for cache_ttl seconds"""
+        if self.cache_ttl > 0:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, value)
+
+    def invalidate_cache(self):
+        """Drop cached subscriber data (called after any write)"""
+        self._cache.clear()
     
     def init_db(self):
         """
         Initialize the Supabase database table
-        Note: Run this SQL in Supabase Dashboard > SQL Editor:
-        
-        CREATE TABLE IF NOT EXISTS ma_subscribers (
-            id BIGSERIAL PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            date_joined TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            verified BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        -- Enable Row Level Security
-        ALTER TABLE ma_subscribers ENABLE ROW LEVEL SECURITY;
+        Note: Run SCHEMA_SQL (logged below) in Supabase Dashboard > SQL Editor.
         
-        -- Create policies for service role access
-        CREATE POLICY "Service role can do anything" ON ma_subscribers
-            FOR ALL USING (auth.role() = 'service_role');
+        Connection notes: this module talks to Supabase over PostgREST (HTTPS),
+        pooled via httpx. Any direct-SQL path (psql, SQLAlchemy) should use the
+        Supabase pooler on port 6543 (transaction mode) for short-lived jobs
+        like the cron pipeline, and port 5432 (session mode) only when it needs
+        session features such as prepared statements or LISTEN/NOTIFY.
         """
         logger.info("⚠️  Initialize the database table in Supabase Dashboard:")
         logger.info("   Go to Supabase Dashboard > SQL Editor and run:")
-        logger.info("""
-        CREATE TABLE IF NOT EXISTS ma_subscribers (
-            id BIGSERIAL PRIMARY KEY,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            date_joined TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            verified BOOLEAN DEFAULT TRUE,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        ALTER TABLE ma_subscribers ENABLE ROW LEVEL SECURITY;
-        CREATE POLICY "Service role can do anything" ON ma_subscribers
-            FOR ALL USING (auth.role() = 'service_role');
-        """)
+        logger.info(SCHEMA_SQL)
     
     def get_all_subscribers(self) -> List[str]:
         """
@@ -81,17 +286,99 @@ class MASupabaseDB:
         
         Returns:
             List of subscriber email addresses
+            
+        Raises:
+            Exception: If Supabase can't be reached after retries - an empty
+                       list always means there really are no subscribers
         """
+        cached = self._cache_get('subscribers')
+        if cached is not None:
+            logger.info("📧 Retrieved %d active subscribers (cached)", len(cached))
+            return list(cached)
+
         try:
-            response = self.supabase.table('ma_subscribers').select('email').eq('unsubscribed', False).execute()
+            emails = list(self.iter_subscribers())
+            self._cache_set('subscribers', tuple(emails))
+            logger.info("📧 Retrieved %d active subscribers", len(emails))
+            return emails
             
+        except Exception as e:
+            logger.error("❌ Error fetching subscribers: %s", e)
+            raise
+    
+    def get_subscriber_set(self) -> FrozenSet[str]:
+        """
+        Get all active subscribers as a frozenset for O(1) membership checks
+        (dedup against bounce lists, test recipients, another audience, ...)
+        
+        Returns:
+            Frozenset of subscriber email addresses
+        """
+        cached = self._cache_get('subscriber_set')
+        if cached is not None:
+            return cached
+
+        subscribers = frozenset(self.get_all_subscribers())
+        if subscribers:
+            self._cache_set('subscriber_set', subscribers)
+        return subscribers
+    
+    def get_subscriber_shard(self, shard: int, shard_count: int) -> List[str]:
+        """
+        Get one hash shard of the active subscribers via the get_mailer_batch RPC
+        Lets parallel mailer workers each fetch only their own 1/shard_count slice
+        
+        Args:
+            shard: Zero-based shard index
+            shard_count: Total number of shards
+            
+        Returns:
+            List of subscriber email addresses in this shard
+        """
+        if not 0 <= shard < shard_count:
+            raise ValueError(f"shard must be in [0, {shard_count}), got {shard}")
+
+        try:
+            response = self._execute(self.supabase.rpc('get_mailer_batch', {'shard': shard, 'n': shard_count}))
             emails = [row['email'] for row in response.data]
-            logger.info(f"📧 Retrieved {len(emails)} active subscribers")
+            logger.info("📧 Retrieved %d subscribers for shard %d/%d", len(emails), shard + 1, shard_count)
             return emails
             
         except Exception as e:
-            logger.error(f"❌ Error fetching subscribers: {e}")
-            return []
+            logger.error("❌ Error fetching subscriber shard %d/%d: %s", shard + 1, shard_count, e)
+            raise
+    
+    def iter_subscribers(self, batch: int = 1000) -> Iterator[str]:
+        """
+        Stream active subscriber emails using keyset pagination (id > last_id)
+        Keeps memory flat and lets Postgres walk the primary key index
+        
+        Args:
+            batch: Rows fetched per request
+            
+        Yields:
+            Subscriber email addresses, ordered by id
+        """
+        last_id = 0
+        while True:
+            response = self._execute(
+                self.supabase.table('ma_subscribers')
+                .select('id,email')
+                .eq('unsubscribed', False)
+                .gt('id', last_id)
+                .order('id')
+                .limit(batch)
+                .csv()
+            )
+            rows = _parse_csv_rows(response.data)
+            for _, email in rows:
+                # Interned so the long-lived cached list and other email sets
+                # (e.g. the Resend audience) share one object per address
+                yield sys.intern(email)
+            
+            if len(rows) < batch:
+                return
+            last_id = int(rows[-1][0])
     
     def add_subscriber(self, email: str) -> bool:
         """
@@ -102,24 +389,69 @@ class MASupabaseDB:
             email: Subscriber email address
             
         Returns:
-            True if successful, False otherwise
+            True if the subscriber was newly added, False otherwise
         """
-        try:
-            response = self.supabase.table('ma_subscribers').insert({
-                'email': email.lower().strip(),
-                'date_joined': datetime.now().isoformat(),
-                'verified': True
-            }).execute()
-            
-            logger.info(f"✅ Added subscriber: {email}")
+        added = self.add_subscribers([email])
+        if added:
+            logger.info("✅ Added subscriber: %s", email)
             return True
+        return False
+    
+    def add_subscribers(self, emails: List[str], chunk_size: int = 1000,
+                        prefilter: bool = False) -> int:
+        """
+        Add many subscribers with one upsert per chunk instead of one INSERT per email
+        Duplicates are skipped server-side (ON CONFLICT DO NOTHING); addresses
+        already in the cached subscriber set are skipped before any request
+        
+        Args:
+            emails: Subscriber email addresses
+            chunk_size: Rows per request (PostgREST row limit)
+            prefilter: Load the subscriber set first if it isn't cached - worth
+                       it for bulk imports that mostly re-add existing addresses
             
-        except Exception as e:
-            if 'duplicate key' in str(e).lower():
-                logger.warning(f"⚠️  {email} is already subscribed")
-            else:
-                logger.error(f"❌ Error adding subscriber {email}: {e}")
-            return False
+        Returns:
+            Number of subscribers newly added
+        """
+        # Normalize once and drop repeats so each address is serialized only once
+        unique_emails = dict.fromkeys(email.lower().strip() for email in emails)
+        
+        known = self.get_subscriber_set() if prefilter else self._cache_get('subscriber_set')
+        if known:
+            before = len(unique_emails)
+            unique_emails = [email for email in unique_emails if email not in known]
+            already = before - len(unique_emails)
+            if already:
+                logger.info("📝 Skipping %d addresses that are already subscribed", already)
+        
+        # date_joined is left to the column's DEFAULT NOW()
+        rows = [{'email': email, 'verified': True} for email in unique_emails]
+        
+        added = 0
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                response = self._execute(self.supabase.table('ma_subscribers').upsert(
+                    chunk, on_conflict='email', ignore_duplicates=True
+                ))
+                added += len(response.data)
+            except APIError as e:
+                if e.code == PG_INSUFFICIENT_PRIVILEGE:
+                    logger.error("❌ Permission denied adding subscribers (check RLS policy / service role key)")
+                    break
+                logger.error("❌ Error adding %d subscribers: %s", len(chunk), e)
+            except CircuitOpenError as e:
+                logger.error("❌ Error adding subscribers: %s", e)
+                break
+            except Exception as e:
+                logger.error("❌ Error adding %d subscribers: %s", len(chunk), e)
+        
+        if added:
+            self.invalidate_cache()
+        skipped = len(rows) - added
+        if skipped:
+            logger.warning("⚠️  %d of %d emails were already subscribed or failed", skipped, len(rows))
+        return added
     
     def remove_subscriber(self, email: str) -> bool:
         """
@@ -132,31 +464,62 @@ class MASupabaseDB:
             True if successful, False otherwise
         """
         try:
-            response = self.supabase.table('ma_subscribers').delete().eq('email', email.lower().strip()).execute()
+            self._execute(self.supabase.table('ma_subscribers').delete().eq('email', email.lower().strip()))
+            self.invalidate_cache()
             
-            logger.info(f"🗑️  Removed subscriber: {email}")
+            logger.info("🗑️  Removed subscriber: %s", email)
             return True
             
         except Exception as e:
-            logger.error(f"❌ Error removing subscriber {email}: {e}")
+            logger.error("❌ Error removing subscriber %s: %s", email, e)
             return False
     
-    def get_subscriber_count(self) -> int:
+    def get_subscriber_count(self, fast: bool = False) -> int:
         """
         Get total count of active subscribers (not unsubscribed)
+        Exact counts go through the ma_active_subscriber_count() RPC; if that
+        function isn't deployed, falls back to a HEAD request so only the
+        Content-Range count comes back
+        
+        Args:
+            fast: Use the planner's estimate ('planned') instead of an exact
+                  count - fine for dashboards where ±5% is acceptable
         
         Returns:
             Number of active subscribers
+            
+        Raises:
+            Exception: If Supabase can't be reached after retries
         """
+        cache_key = 'count_planned' if fast else 'count'
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            logger.info("📊 Total active subscribers: %d (cached)", cached)
+            return cached
+
         try:
-            response = self.supabase.table('ma_subscribers').select('id', count='exact').eq('unsubscribed', False).execute()
-            count = response.count or 0
-            logger.info(f"📊 Total active subscribers: {count}")
+            count = None
+            if not fast:
+                try:
+                    count = self._execute(self.supabase.rpc('ma_active_subscriber_count')).data
+                except APIError as e:
+                    if e.code != PGRST_FUNCTION_NOT_FOUND:
+                        raise
+                    logger.debug("ma_active_subscriber_count() not deployed, using HEAD count")
+            if count is None:
+                count_method = 'planned' if fast else 'exact'
+                response = self._execute(
+                    self.supabase.table('ma_subscribers').select('id', count=count_method, head=True).eq('unsubscribed', False)
+                )
+                count = response.count
+            count = int(count or 0)
+            self._cache_set(cache_key, count)
+            logger.info("📊 Total active subscribers: %d", count)
             return count
             
         except Exception as e:
-            logger.error(f"❌ Error getting subscriber count: {e}")
-            return 0
+            logger.error("❌ Error getting subscriber count: %s", e)
+            raise
     
     def test_connection(self) -> bool:
         """
@@ -166,23 +529,262 @@ class MASupabaseDB:
             True if connection works, False otherwise
         """
         try:
-            # Try to query the table
-            response = self.supabase.table('ma_subscribers').select('id').limit(1).execute()
+            # HEAD with limit(0): a pure connectivity/auth probe, no rows transferred
+            self.supabase.table('ma_subscribers').select('id', head=True, count='planned').limit(0).execute()
             logger.info("✅ Supabase connection test successful")
             return True
             
         except Exception as e:
-            logger.error(f"❌ Supabase connection test failed: {e}")
+            logger.error("❌ Supabase connection test failed: %s", e)
             return False
 
+
+class MASupabaseDBAsync:
+    """
+    Async variant of MASupabaseDB
+    Lets callers await queries and fan out many subscriber operations on one event loop
+    """
+
+    def __init__(self, supabase: AsyncClient, http_client: httpx.AsyncClient):
+        """Use MASupabaseDBAsync.create() instead of calling this directly"""
+        self.supabase = supabase
+        self.http_client = http_client
+
+        self._breaker = _CircuitBreaker()
+
+    @classmethod
+    async def create(cls) -> "MASupabaseDBAsync":
+        """Initialize async Supabase client backed by one pooled httpx client"""
+        supabase_url = SUPABASE_URL
+        supabase_key = SUPABASE_SERVICE_ROLE_KEY
+
+        if not supabase_url or not supabase_key:
+            raise ValueError(
+                "Missing Supabase credentials. Set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables."
+            )
+
+        # One shared connection pool so TCP+TLS handshakes are reused across queries
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DB_REQUEST_TIMEOUT),
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20, keepalive_expiry=60)
+        )
+
+        try:
+            supabase = await acreate_client(
+                supabase_url,
+                supabase_key,
+                options=AsyncClientOptions(httpx_client=http_client)
+            )
+            logger.info("✅ Connected to Supabase database (async)")
+        except Exception as e:
+            await http_client.aclose()
+            logger.error("❌ Failed to connect to Supabase: %s", e)
+            raise
+
+        return cls(supabase, http_client)
+
+    async def close(self):
+        """Close the pooled HTTP connections"""
+        await self.http_client.aclose()
+
+    async def _execute(self, query):
+        """
+        Execute a PostgREST query, retrying transient failures with backoff
+
+        Raises:
+            CircuitOpenError: Supabase failed repeatedly and is being skipped
+            Exception: The last error once retries are exhausted
+        """
+        self._breaker.check()
+
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                response = await query.execute()
+            except Exception as e:
+                delay = self._breaker.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                self._breaker.record_success()
+                return response
+
+    async def get_all_subscribers(self, batch: int = 1000) -> List[str]:
+        """
+        Get all active subscribers (not unsubscribed)
+        Pages with the same keyset/CSV query as MASupabaseDB.iter_subscribers
+
+        Args:
+            batch: Rows fetched per request
+
+        Returns:
+            List of subscriber email addresses, ordered by id
+
+        Raises:
+            Exception: If Supabase can't be reached after retries - an empty
+                       list always means there really are no subscribers
+        """
+        try:
+            emails = []
+            last_id = 0
+            while True:
+                response = await self._execute(
+                    self.supabase.table('ma_subscribers')
+                    .select('id,email')
+                    .eq('unsubscribed', False)
+                    .gt('id', last_id)
+                    .order('id')
+                    .limit(batch)
+                    .csv()
+                )
+                rows = _parse_csv_rows(response.data)
+                emails.extend(sys.intern(email) for _, email in rows)
+                if len(rows) < batch:
+                    break
+                last_id = int(rows[-1][0])
+
+            logger.info("📧 Retrieved %d active subscribers", len(emails))
+            return emails
+
+        except Exception as e:
+            logger.error("❌ Error fetching subscribers: %s", e)
+            raise
+
+    async def add_subscriber(self, email: str) -> bool:
+        """
+        Add a new subscriber
+
+        Args:
+            email: Subscriber email address
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            await self._execute(self.supabase.table('ma_subscribers').insert({
+                'email': email.lower().strip(),
+                'verified': True
+            }))
+
+            logger.info("✅ Added subscriber: %s", email)
+            return True
+
+        except APIError as e:
+            if e.code == PG_UNIQUE_VIOLATION:
+                logger.warning("⚠️  %s is already subscribed", email)
+            elif e.code == PG_INSUFFICIENT_PRIVILEGE:
+                logger.error("❌ Permission denied adding %s (check RLS policy / service role key)", email)
+            else:
+                logger.error("❌ Error adding subscriber %s: %s", email, e)
+            return False
+        except Exception as e:
+            logger.error("❌ Error adding subscriber %s: %s", email, e)
+            return False
+
+    async def remove_subscriber(self, email: str) -> bool:
+        """
+        Remove a subscriber
+
+        Args:
+            email: Subscriber email address
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            await self._execute(self.supabase.table('ma_subscribers').delete().eq('email', email.lower().strip()))
+
+            logger.info("🗑️  Removed subscriber: %s", email)
+            return True
+
+        except Exception as e:
+            logger.error("❌ Error removing subscriber %s: %s", email, e)
+            return False
+
+    async def get_subscriber_count(self, fast: bool = False) -> int:
+        """
+        Get total count of active subscribers (not unsubscribed)
+
+        Args:
+            fast: Use the planner's estimate ('planned') instead of an exact count
+
+        Returns:
+            Number of active subscribers
+
+        Raises:
+            Exception: If Supabase can't be reached after retries
+        """
+        try:
+            count = None
+            if not fast:
+                try:
+                    count = (await self._execute(self.supabase.rpc('ma_active_subscriber_count'))).data
+                except APIError as e:
+                    if e.code != PGRST_FUNCTION_NOT_FOUND:
+                        raise
+                    logger.debug("ma_active_subscriber_count() not deployed, using HEAD count")
+            if count is None:
+                count_method = 'planned' if fast else 'exact'
+                response = await self._execute(
+                    self.supabase.table('ma_subscribers').select('id', count=count_method, head=True).eq('unsubscribed', False)
+                )
+                count = response.count
+            count = int(count or 0)
+            logger.info("📊 Total active subscribers: %d", count)
+            return count
+
+        except Exception as e:
+            logger.error("❌ Error getting subscriber count: %s", e)
+            raise
+
+    async def test_connection(self) -> bool:
+        """
+        Test the Supabase connection
+
+        Returns:
+            True if connection works, False otherwise
+        """
+        try:
+            await self._execute(self.supabase.table('ma_subscribers').select('id', head=True, count='planned').limit(0))
+            logger.info("✅ Supabase connection test successful")
+            return True
+
+        except Exception as e:
+            logger.error("❌ Supabase connection test failed: %s", e)
+            return False
+
+
+def run_async(method_name: str, *args):
+    """
+    Run a single MASupabaseDBAsync method from synchronous code (CLI use)
+
+    Args:
+        method_name: Name of the async method, e.g. 'get_all_subscribers'
+        *args: Arguments forwarded to the method
+
+    Returns:
+        Whatever the async method returns
+    """
+    async def _runner():
+        db = await MASupabaseDBAsync.create()
+        try:
+            return await getattr(db, method_name)(*args)
+        finally:
+            await db.close()
+
+    return asyncio.run(_runner())
+
 # Convenience functions for backward compatibility
 _db_instance = None
+_db_lock = threading.Lock()
 
 def get_db() -> MASupabaseDB:
-    """Get the database instance (singleton)"""
+    """Get the database instance (thread-safe singleton)"""
     global _db_instance
     if _db_instance is None:
-        _db_instance = MASupabaseDB()
+        with _db_lock:
+            if _db_instance is None:
+                _db_instance = MASupabaseDB()
     return _db_instance
 
 def init_db():
@@ -195,38 +797,62 @@ def add_subscriber(email: str) -> bool:
     db = get_db()
     return db.add_subscriber(email)
 
+def add_subscribers(emails: List[str]) -> int:
+    """Add subscribers in bulk"""
+    db = get_db()
+    return db.add_subscribers(emails)
+
 def get_all_subscribers() -> List[str]:
     """Get all subscribers"""
     db = get_db()
     return db.get_all_subscribers()
 
+def get_subscriber_shard(shard: int, shard_count: int) -> List[str]:
+    """Get one hash shard of subscribers"""
+    db = get_db()
+    return db.get_subscriber_shard(shard, shard_count)
+
+def get_subscriber_set() -> FrozenSet[str]:
+    """Get all subscribers as a frozenset"""
+    db = get_db()
+    return db.get_subscriber_set()
+
 def remove_subscriber(email: str) -> bool:
     """Remove subscriber"""
     db = get_db()
     return db.remove_subscriber(email)
 
-def get_subscriber_count() -> int:
+def get_subscriber_count(fast: bool = False) -> int:
     """Get subscriber count"""
     db = get_db()
-    return db.get_subscriber_count()
+    return db.get_subscriber_count(fast=fast)
+
+async def _self_test():
+    """Run the connection check, count and list fetch concurrently"""
+    db = await MASupabaseDBAsync.create()
+    try:
+        return await asyncio.gather(
+            db.test_connection(),
+            db.get_subscriber_count(),
+            db.get_all_subscribers()
+        )
+    finally:
+        await db.close()
 
 if __name__ == "__main__":
     # Test the connection
     logging.basicConfig(level=logging.INFO)
     
     try:
-        db = MASupabaseDB()
+        connected, count, subscribers = asyncio.run(_self_test())
         
-        # Test connection
-        if db.test_connection():
+        if connected:
             print("🎉 Supabase integration working!")
             
             # Show current stats
-            count = db.get_subscriber_count()
             print(f"📊 Current subscribers: {count}")
             
-            # Get sample of subscribers (for testing)
-            subscribers = db.get_all_subscribers()
+            # Sample of subscribers (for testing)
             if subscribers:
                 print(f"📧 Sample subscribers: {subscribers[:3]}...")
             else:
@@ -238,4 +864,4 @@ if __name__ == "__main__":
         print(f"❌ Error: {e}")
         print("\n💡 Make sure to set these environment variables:")
         print("   SUPABASE_URL=https://your-project-ref.supabase.co")
-        print("   SUPABASE_SERVICE_ROLE_KEY=your-service-role-key")
\ No newline at end of file
+        print("   SUPABASE_SERVICE_ROLE_KEY=your-service-role-key")
@@ -3,221 +3,154 @@ Creates the HTML emails for finance newsletters
 """
 
 import logging
+import re
+from html import escape
+from io import StringIO
+from string import Template
 from typing import List, Dict, Optional
 from datetime import datetime
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
+# Placeholder left in the greeting so one rendered newsletter serves every recipient
+RECIPIENT_NAME_TOKEN = "__RCPT_NAME_TOKEN__"
 
-@dataclass
-class SummarizedDeal:
-    """Deal data structure (matches deal_summarizer.py)"""
-    title: str
-    description: str
-    ai_summary: str
-    key_points: List[str]
-    source: str
-    url: str
-    date: str
-    deal_type: str
-    amount: Optional[str] = None
-    priority_score: float = 0.0
-    companies_involved: List[str] = None
-    sector: Optional[str] = None
-
-
-class HTMLEmailFormatter:
-    def __init__(self, company_name: str = "Finance Insights",
-                 company_logo_url: Optional[str] = None,
-                 brand_color: str = "#1a365d"):
-        """
-        Initialize the HTML formatter
-
-        Args:
-            company_name: Name of my newsletter
-            company_logo_url: URL to my logo (I probably won't make one lol)
-            brand_color: Primary brand color (hex code)
-        """
-        logger.info("Initializing Email Formatter")
-
-        self.company_name = company_name
-        self.company_logo_url = company_logo_url
-        self.brand_color = brand_color
-
-        # Deal type styling
-        self.deal_type_colors = {
-            'VC': '#10b981',  # Green
-            'M&A': '#3b82f6',  # Blue
-            'IPO': '#8b5cf6',  # Purple
-            'IB': '#f59e0b'  # Orange
-        }
-
-        self.deal_type_icons = {
-            'VC': '🚀',
-            'M&A': '🤝',
-            'IPO': '📈',
-            'IB': '🏦'
-        }
+# Date shown in the newsletter header, e.g. "March 04, 2025"
+NEWSLETTER_DATE_FORMAT = "%B %d, %Y"
 
-        logger.info(" Email Formatter initialized")
 
-    def create_newsletter_html(self, newsletter_content: Dict,
-                               recipient_name: Optional[str] = None) -> str:
-        """
-        Create complete HTML newsletter email
+def _escape(value) -> str:
+    """HTML-escape a scraped or user-supplied value (quotes included) for text or attributes"""
+    return escape(str(value), quote=True)
 
-        Args:
-            newsletter_content: Dictionary from deal_summarizer.create_newsletter_content()
-            recipient_name: Optional personalization name
 
-        Returns:
-            Complete HTML email string
-        """
-        logger.info("Creating newsletter email...")
 
-        # Get current date for newsletter
-        current_date = datetime.now().strftime("%B %d, %Y")
+def _minify_css(css: str) -> str:
+    """Strip comments and redundant whitespace so every email carries less CSS"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};])\s*', r'\1', css).strip()
 
-        # Build HTML email
-        html_email = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{newsletter_content.get('headline', 'Finance Newsletter')}</title>
-    <style>
-        {self._get_email_styles()}
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        {self._create_header(current_date)}
-        {self._create_greeting(recipient_name)}
-        {self._create_executive_summary(newsletter_content)}
-        {self._create_deals_sections(newsletter_content.get('deal_sections', {}))}
-        {self._create_market_insights(newsletter_content)}
-        {self._create_footer()}
-    </div>
-</body>
-</html>
-"""
-
-        logger.info("Newsletter email created successfully")
-        return html_email
+# Plain text version rules, per-deal lines and footer
+_TEXT_RULE = "=" * 60
+_TEXT_SUBRULE = "-" * 40
+_TEXT_DEAL_TAIL = "   Summary: {summary}\n   Source: {source} | Date: {date}\n   Link: {url}\n"
+_TEXT_FOOTER = (
+    _TEXT_RULE,
+    "This newsletter was generated automatically from verified financial news sources.",
+    "Questions? Reply to this email or contact our team.",
+)
 
-    def _get_email_styles(self) -> str:
-        """Get comprehensive CSS styles for the email"""
-
-        return f"""
+# Email CSS; $brand_color is filled in once per formatter
+_CSS_TEMPLATE = Template("""
         /* Reset and base styles */
-        body, table, td, p, a, li, blockquote {{
+        body, table, td, p, a, li, blockquote {
             -webkit-text-size-adjust: 100%;
             -ms-text-size-adjust: 100%;
             margin: 0;
             padding: 0;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Helvetica, Arial, sans-serif;
             line-height: 1.6;
             color: #333333;
             background-color: #f8fafc;
-        }}
+        }
 
-        .email-container {{
+        .email-container {
             max-width: 600px;
             margin: 0 auto;
             background-color: #ffffff;
             box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }}
+        }
 
         /* Header styles */
-        .header {{
-            background: linear-gradient(135deg, {self.brand_color} 0%, #2d3748 100%);
+        .header {
+            background: linear-gradient(135deg, $brand_color 0%, #2d3748 100%);
             color: white;
             padding: 30px 20px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             margin: 0;
             font-size: 28px;
             font-weight: 700;
             letter-spacing: -0.5px;
-        }}
+        }
 
-        .header .date {{
+        .header .date {
             margin-top: 8px;
             font-size: 14px;
             opacity: 0.9;
-        }}
+        }
 
-        .logo {{
+        .logo {
             max-height: 40px;
             margin-bottom: 15px;
-        }}
+        }
 
         /* Content styles */
-        .content {{
+        .content {
             padding: 30px 20px;
-        }}
+        }
 
-        .greeting {{
+        .greeting {
             font-size: 16px;
             margin-bottom: 25px;
             color: #4a5568;
-        }}
+        }
 
-        .executive-summary {{
+        .executive-summary {
             background-color: #f7fafc;
-            border-left: 4px solid {self.brand_color};
+            border-left: 4px solid $brand_color;
             padding: 20px;
             margin-bottom: 30px;
             border-radius: 0 8px 8px 0;
-        }}
+        }
 
-        .executive-summary h2 {{
+        .executive-summary h2 {
             margin: 0 0 15px 0;
-            color: {self.brand_color};
+            color: $brand_color;
             font-size: 20px;
             font-weight: 600;
-        }}
+        }
 
-        .executive-summary p {{
+        .executive-summary p {
             margin: 0;
             font-size: 16px;
             line-height: 1.7;
-        }}
+        }
 
         /* Deal sections */
-        .deal-section {{
+        .deal-section {
             margin-bottom: 35px;
-        }}
+        }
 
-        .deal-section-header {{
+        .deal-section-header {
             display: flex;
             align-items: center;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid #e2e8f0;
-        }}
+        }
 
-        .deal-section-header h3 {{
+        .deal-section-header h3 {
             margin: 0;
             font-size: 22px;
             font-weight: 600;
             color: #2d3748;
-        }}
+        }
 
-        .deal-section-icon {{
+        .deal-section-icon {
             font-size: 24px;
             margin-right: 10px;
-        }}
+        }
 
         /* Individual deal cards */
-        .deal-card {{
+        .deal-card {
             background-color: #ffffff;
             border: 1px solid #e2e8f0;
             border-radius: 12px;
@@ -225,462 +158,591 @@ class HTMLEmailFormatter:
             margin-bottom: 20px;
             box-shadow: 0 2px 4px rgba(0, 0, 0, 0.05);
             transition: box-shadow 0.3s ease;
-        }}
+        }
 
-        .deal-card:hover {{
+        .deal-card:hover {
             box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        }}
+        }
 
-        .deal-title {{
+        .deal-title {
             font-size: 18px;
             font-weight: 600;
             color: #1a202c;
             margin: 0 0 12px 0;
             line-height: 1.4;
-        }}
+        }
 
-        .deal-title a {{
+        .deal-title a {
             color: #1a202c;
             text-decoration: none;
-        }}
+        }
 
-        .deal-title a:hover {{
-            color: {self.brand_color};
-        }}
+        .deal-title a:hover {
+            color: $brand_color;
+        }
 
-        .deal-meta {{
+        .deal-meta {
             display: flex;
             flex-wrap: wrap;
             gap: 15px;
             margin-bottom: 15px;
             font-size: 14px;
-        }}
+        }
 
-        .deal-tag {{
+        .deal-tag {
             padding: 4px 12px;
             border-radius: 20px;
             font-weight: 500;
             font-size: 12px;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .deal-tag.vc {{
+        .deal-tag.vc {
             background-color: #d1fae5;
             color: #065f46;
-        }}
+        }
 
-        .deal-tag.ma {{
+        .deal-tag.ma {
             background-color: #dbeafe;
             color: #1e40af;
-        }}
+        }
 
-        .deal-tag.ipo {{
+        .deal-tag.ipo {
             background-color: #ede9fe;
             color: #6b21a8;
-        }}
+        }
 
-        .deal-tag.ib {{
+        .deal-tag.ib {
             background-color: #fef3c7;
             color: #92400e;
-        }}
+        }
 
-        .deal-amount {{
+        .deal-amount {
             font-weight: 700;
             color: #059669;
             font-size: 16px;
-        }}
+        }
 
-        .deal-source {{
+        .deal-source {
             color: #6b7280;
             font-size: 13px;
-        }}
+        }
 
-        .deal-date {{
+        .deal-date {
             color: #6b7280;
             font-size: 13px;
-        }}
+        }
 
-        .deal-summary {{
+        .deal-summary {
             margin: 15px 0;
             font-size: 15px;
             line-height: 1.6;
             color: #374151;
-        }}
+        }
 
-        .deal-points {{
+        .deal-points {
             margin: 15px 0;
-        }}
+        }
 
-        .deal-points ul {{
+        .deal-points ul {
             margin: 0;
             padding-left: 20px;
-        }}
+        }
 
-        .deal-points li {{
+        .deal-points li {
             margin-bottom: 8px;
             color: #4b5563;
             font-size: 14px;
-        }}
+        }
 
-        .companies-involved {{
+        .companies-involved {
             margin-top: 15px;
             padding-top: 15px;
             border-top: 1px solid #f3f4f6;
-        }}
+        }
 
-        .companies-involved h5 {{
+        .companies-involved h5 {
             margin: 0 0 8px 0;
             font-size: 13px;
             font-weight: 600;
             color: #6b7280;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .companies-list {{
+        .companies-list {
             display: flex;
             flex-wrap: wrap;
             gap: 8px;
-        }}
+        }
 
-        .company-tag {{
+        .company-tag {
             background-color: #f3f4f6;
             color: #374151;
             padding: 4px 8px;
             border-radius: 6px;
             font-size: 12px;
             font-weight: 500;
-        }}
+        }
 
         /* Market insights */
-        .market-insights {{
+        .market-insights {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 25px;
             border-radius: 12px;
             margin: 30px 0;
-        }}
+        }
 
-        .market-insights h3 {{
+        .market-insights h3 {
             margin: 0 0 15px 0;
             font-size: 20px;
             font-weight: 600;
-        }}
+        }
 
-        .market-insights p {{
+        .market-insights p {
             margin: 0;
             font-size: 16px;
             line-height: 1.6;
             opacity: 0.95;
-        }}
+        }
 
         /* Footer */
-        .footer {{
+        .footer {
             background-color: #f8fafc;
             padding: 25px 20px;
             text-align: center;
             border-top: 1px solid #e2e8f0;
-        }}
+        }
 
-        .footer p {{
+        .footer p {
             margin: 0;
             font-size: 14px;
             color: #6b7280;
-        }}
+        }
 
-        .footer a {{
-            color: {self.brand_color};
+        .footer a {
+            color: $brand_color;
             text-decoration: none;
-        }}
+        }
 
-        .footer a:hover {{
+        .footer a:hover {
             text-decoration: underline;
-        }}
+        }
 
         /* Responsive design */
-        @media only screen and (max-width: 600px) {{
-            .email-container {{
+        @media only screen and (max-width: 600px) {
+            .email-container {
                 width: 100% !important;
                 max-width: 100% !important;
-            }}
+            }
 
-            .content {{
+            .content {
                 padding: 20px 15px !important;
-            }}
+            }
 
-            .header {{
+            .header {
                 padding: 20px 15px !important;
-            }}
+            }
 
-            .header h1 {{
+            .header h1 {
                 font-size: 24px !important;
-            }}
+            }
 
-            .deal-card {{
+            .deal-card {
                 padding: 20px !important;
-            }}
+            }
 
-            .deal-meta {{
+            .deal-meta {
                 flex-direction: column !important;
                 gap: 8px !important;
-            }}
-        }}
-        """
+            }
+        }
+        """)
 
-    def _create_header(self, current_date: str) -> str:
-        """Create email header section"""
+# Fixed HTML blocks, filled in per newsletter with substitute()
+_DOCUMENT_HEAD_TMPL = Template("""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title</title>
+    <style>
+        $styles
+    </style>
+</head>
+<body>
+    <div class="email-container">
+        """)
 
-        logo_html = ""
-        if self.company_logo_url:
-            logo_html = f'<img src="{self.company_logo_url}" alt="{self.company_name}" class="logo">'
+_DOCUMENT_TAIL = """
+    </div>
+</body>
+</html>
+"""
 
-        return f"""
+# Separator between the top-level blocks written into the email container
+_BLOCK_SEP = "\n        "
+
+_HEADER_TMPL = Template("""
         <div class="header">
-            {logo_html}
-            <h1>{self.company_name} Finance Brief</h1>
-            <div class="date">{current_date}</div>
+            $logo
+            <h1>$company_name Finance Brief</h1>
+            <div class="date">$date</div>
         </div>
-        """
+        """)
 
-    def _create_greeting(self, recipient_name: Optional[str]) -> str:
-        """Create personalized greeting"""
-
-        greeting = "Good morning"
-        if recipient_name:
-            greeting += f", {recipient_name}"
-
-        return f"""
+_GREETING_TMPL = Template("""
         <div class="content">
             <div class="greeting">
-                {greeting}! Here's your weekly roundup of the most important deals in investment banking, venture capital, and M&A.
+                $greeting! Here's your weekly roundup of the most important deals in investment banking, venture capital, and M&A.
             </div>
-        """
+        """)
 
-    def _create_executive_summary(self, newsletter_content: Dict) -> str:
-        """Create executive summary section"""
+_SUMMARY_TMPL = Template("""
+            <div class="executive-summary">
+                <h2>$headline</h2>
+                <p>$summary</p>
+            </div>
+        """)
 
-        headline = newsletter_content.get('headline', 'Weekly Finance Update')
-        summary = newsletter_content.get('executive_summary',
-                                         'Key financial deals and market movements from this week.')
+_INSIGHTS_TMPL = Template("""
+            <div class="market-insights">
+                <h3> Market Insights</h3>
+                <p>$insights</p>
+            </div>
+        """)
 
-        return f"""
-            <div class="executive-summary">
-                <h2>{headline}</h2>
-                <p>{summary}</p>
+_FOOTER_TMPL = Template("""
+        </div>
+        <div class="footer">
+            <div class="unsubscribe-section">
+                <p><strong>📧 Manage Your Subscription</strong></p>
+                <p>To unsubscribe, simply reply to this email with "UNSUBSCRIBE" in the subject line.</p>
+                <p>You can also email us directly: <a href="mailto:$sender_email?subject=Unsubscribe%20Request">unsubscribe@darren-murphy.com</a></p>
             </div>
+            
+            <p><strong>$company_name</strong> - Professional M&A Intelligence</p>
+            <p>This newsletter contains curated financial news from verified sources including Reuters, Bloomberg, and CNBC.</p>
+            <p>© 2024 Darren Murphy. All rights reserved.</p>
+            
+            <p style="font-size: 12px; color: #9ca3af; margin-top: 20px;">
+                This email was sent to you because you subscribed to our M&A newsletter. 
+                We respect your privacy and will never share your information.
+            </p>
+        </div>
+        """)
+
+
+@dataclass(slots=True)
+class SummarizedDeal:
+    """Deal data structure (matches deal_summarizer.py)"""
+    title: str
+    description: str
+    ai_summary: str
+    key_points: List[str]
+    source: str
+    url: str
+    date: str
+    deal_type: str
+    amount: Optional[str] = None
+    priority_score: float = 0.0
+    companies_involved: List[str] = None
+    sector: Optional[str] = None
+
+
+class HTMLEmailFormatter:
+    # Deal sections are shown in this priority order, followed by any others
+    _SECTION_ORDER = ('M&A', 'IPO', 'VC', 'IB')
+    _SECTION_ORDER_SET = frozenset(_SECTION_ORDER)
+
+    # CSS tag class for each known deal type
+    _TAG_CLASS = {'M&A': 'ma', 'IPO': 'ipo', 'VC': 'vc', 'IB': 'ib'}
+
+    # Deal type styling
+    deal_type_colors = {
+        'VC': '#10b981',  # Green
+        'M&A': '#3b82f6',  # Blue
+        'IPO': '#8b5cf6',  # Purple
+        'IB': '#f59e0b'  # Orange
+    }
+
+    deal_type_icons = {
+        'VC': '🚀',
+        'M&A': '🤝',
+        'IPO': '📈',
+        'IB': '🏦'
+    }
+
+    _DEAL_TYPE_NAMES = {
+        'VC': 'Venture Capital',
+        'M&A': 'Mergers & Acquisitions',
+        'IPO': 'Initial Public Offerings',
+        'IB': 'Investment Banking'
+    }
+
+    def __init__(self, company_name: str = "Finance Insights",
+                 company_logo_url: Optional[str] = None,
+                 brand_color: str = "#1a365d"):
         """
+        Initialize the HTML formatter
 
-    def _create_deals_sections(self, deal_sections: Dict) -> str:
-        """Create sections for each deal type"""
+        Args:
+            company_name: Name of my newsletter
+            company_logo_url: URL to my logo (I probably won't make one lol)
+            brand_color: Primary brand color (hex code)
+        """
 
-        sections_html = ""
+        self.company_name = company_name
+        self.company_logo_url = company_logo_url
+        self.brand_color = brand_color
 
-        # Order sections by priority
-        section_order = ['M&A', 'IPO', 'VC', 'IB']
+        # Static chrome (CSS + footer) is identical for every newsletter this
+        # formatter renders, so build it once instead of on every send
+        self._email_styles = _minify_css(_CSS_TEMPLATE.substitute(brand_color=brand_color))
+        self._footer_html = self._create_footer()
 
-        for deal_type in section_order:
-            if deal_type in deal_sections:
-                deals = deal_sections[deal_type]
-                sections_html += self._create_single_deal_section(deal_type, deals)
+        logger.debug("Email Formatter initialized")
 
-        # Add any remaining sections not in the priority order
-        for deal_type, deals in deal_sections.items():
-            if deal_type not in section_order:
-                sections_html += self._create_single_deal_section(deal_type, deals)
+    def create_newsletter_html(self, newsletter_content: Dict,
+                               recipient_name: Optional[str] = None,
+                               current_date: Optional[str] = None) -> str:
+        """
+        Create complete HTML newsletter email
 
-        return sections_html
+        Args:
+            newsletter_content: Dictionary from deal_summarizer.create_newsletter_content()
+            recipient_name: Optional personalization name
+            current_date: Preformatted newsletter date (defaults to today)
 
-    def _create_single_deal_section(self, deal_type: str, deals: List[Dict]) -> str:
-        """Create HTML for a single deal type section"""
+        Returns:
+            Complete HTML email string
+        """
+        return self.personalize(self.create_base_html(newsletter_content, current_date), recipient_name)
 
-        icon = self.deal_type_icons.get(deal_type, '💼')
+    @staticmethod
+    def personalize(base_html: str, recipient_name: Optional[str] = None) -> str:
+        """
+        Fill the recipient name into HTML from create_base_html()
 
-        # Section header
-        section_html = f"""
-            <div class="deal-section">
-                <div class="deal-section-header">
-                    <span class="deal-section-icon">{icon}</span>
-                    <h3>{self._get_deal_type_name(deal_type)} ({len(deals)})</h3>
-                </div>
+        Args:
+            base_html: Newsletter HTML containing RECIPIENT_NAME_TOKEN
+            recipient_name: Optional personalization name
+
+        Returns:
+            HTML email string for this recipient
         """
+        name = f", {_escape(recipient_name)}" if recipient_name else ""
+        return base_html.replace(RECIPIENT_NAME_TOKEN, name)
 
-        # Individual deal cards
-        for deal in deals:
-            section_html += self._create_deal_card(deal, deal_type)
+    def create_base_html(self, newsletter_content: Dict,
+                         current_date: Optional[str] = None) -> str:
+        """
+        Create the shared HTML newsletter, rendered once for every recipient
 
-        section_html += "</div>"
+        Args:
+            newsletter_content: Dictionary from deal_summarizer.create_newsletter_content()
+            current_date: Preformatted newsletter date (defaults to today)
 
-        return section_html
+        Returns:
+            HTML email string with RECIPIENT_NAME_TOKEN in place of the name
+        """
+        logger.debug("Creating newsletter email...")
 
-    def _create_deal_card(self, deal: Dict, deal_type: str) -> str:
-        """Create HTML for individual deal card"""
+        # Get current date for newsletter
+        if current_date is None:
+            current_date = datetime.now().strftime(NEWSLETTER_DATE_FORMAT)
+
+        # Build HTML email into one buffer instead of joining per-section strings
+        buf = StringIO()
+        buf.write(_DOCUMENT_HEAD_TMPL.substitute(
+            title=_escape(newsletter_content.get('headline', 'Finance Newsletter')),
+            styles=self._email_styles,
+        ))
+        self._create_header(buf, current_date)
+        buf.write(_BLOCK_SEP)
+        self._create_greeting(buf)
+        buf.write(_BLOCK_SEP)
+        self._create_executive_summary(buf, newsletter_content)
+        buf.write(_BLOCK_SEP)
+        self._create_deals_sections(buf, newsletter_content.get('deal_sections', {}))
+        buf.write(_BLOCK_SEP)
+        self._create_market_insights(buf, newsletter_content)
+        buf.write(_BLOCK_SEP)
+        buf.write(self._footer_html)
+        buf.write(_DOCUMENT_TAIL)
+        html_email = buf.getvalue()
+
+        logger.debug("Newsletter email created successfully")
+        return html_email
 
-        # Deal title with link
-        title_html = f'<h4 class="deal-title"><a href="{deal["url"]}" target="_blank">{deal["title"]}</a></h4>'
+    def _create_header(self, buf: StringIO, current_date: str) -> None:
+        """Create email header section"""
 
-        # Deal metadata
-        meta_items = []
+        logo_html = ""
+        if self.company_logo_url:
+            logo_html = f'<img src="{_escape(self.company_logo_url)}" alt="{_escape(self.company_name)}" class="logo">'
 
-        # Deal type tag
-        tag_class = deal_type.lower().replace('&', '').replace('_', '')
-        meta_items.append(f'<span class="deal-tag {tag_class}">{deal_type}</span>')
+        buf.write(_HEADER_TMPL.substitute(logo=logo_html, company_name=_escape(self.company_name),
+                                           date=_escape(current_date)))
 
-        # Amount
-        if deal.get('amount'):
-            meta_items.append(f'<span class="deal-amount">{deal["amount"]}</span>')
+    def _create_greeting(self, buf: StringIO) -> None:
+        """Create greeting; the name is filled in later by personalize()"""
 
-        # Source and date
-        meta_items.append(f'<span class="deal-source">{deal["source"]}</span>')
-        meta_items.append(f'<span class="deal-date">{deal["date"]}</span>')
+        buf.write(_GREETING_TMPL.substitute(greeting=f"Good morning{RECIPIENT_NAME_TOKEN}"))
+
+    def _create_executive_summary(self, buf: StringIO, newsletter_content: Dict) -> None:
+        """Create executive summary section"""
+
+        headline = newsletter_content.get('headline', 'Weekly Finance Update')
+        summary = newsletter_content.get('executive_summary',
+                                         'Key financial deals and market movements from this week.')
+
+        buf.write(_SUMMARY_TMPL.substitute(headline=_escape(headline), summary=_escape(summary)))
+
+    def _create_deals_sections(self, buf: StringIO, deal_sections: Dict) -> None:
+        """Write sections for each deal type"""
+
+        # Priority sections first, then any remaining ones in their original order
+        ordered = [deal_type for deal_type in self._SECTION_ORDER if deal_type in deal_sections]
+        ordered.extend(deal_type for deal_type in deal_sections if deal_type not in self._SECTION_ORDER_SET)
+
+        for deal_type in ordered:
+            self._create_single_deal_section(buf, deal_type, deal_sections[deal_type])
+
+    def _create_single_deal_section(self, buf: StringIO, deal_type: str, deals: List[Dict]) -> None:
+        """Write HTML for a single deal type section"""
+
+        icon = self.deal_type_icons.get(deal_type, '💼')
+
+        # Section header
+        buf.write('<div class="deal-section">\n<div class="deal-section-header">\n')
+        buf.write(f'<span class="deal-section-icon">{icon}</span>\n')
+        buf.write(f'<h3>{_escape(self._get_deal_type_name(deal_type))} ({len(deals)})</h3>\n</div>\n')
+
+        # Individual deal cards; the tag class is the same for the whole section
+        tag_class = self._tag_class(deal_type)
+        for deal in deals:
+            self._create_deal_card(buf, deal, deal_type, tag_class)
+            buf.write('\n')
 
-        meta_html = f'<div class="deal-meta">{"".join(meta_items)}</div>'
+        buf.write('</div>')
+
+    def _create_deal_card(self, buf: StringIO, deal: Dict, deal_type: str,
+                          tag_class: Optional[str] = None) -> None:
+        """Write HTML for individual deal card"""
+
+        buf.write('<div class="deal-card">')
+
+        # Deal title with link
+        buf.write(f'<h4 class="deal-title"><a href="{_escape(deal["url"])}" target="_blank">{_escape(deal["title"])}</a></h4>')
+
+        # Deal metadata: type tag, amount, source and date
+        if tag_class is None:
+            tag_class = self._tag_class(deal_type)
+        buf.write(f'<div class="deal-meta"><span class="deal-tag {tag_class}">{_escape(deal_type)}</span>')
+        if deal.get('amount'):
+            buf.write(f'<span class="deal-amount">{_escape(deal["amount"])}</span>')
+        buf.write(f'<span class="deal-source">{_escape(deal["source"])}</span>')
+        buf.write(f'<span class="deal-date">{_escape(deal["date"])}</span></div>')
 
         # AI summary
-        summary_html = f'<div class="deal-summary">{deal["summary"]}</div>'
+        buf.write(f'<div class="deal-summary">{_escape(deal["summary"])}</div>')
 
         # Key points
-        points_html = ""
         if deal.get('key_points'):
-            points_list = "".join([f"<li>{point}</li>" for point in deal['key_points']])
-            points_html = f'<div class="deal-points"><ul>{points_list}</ul></div>'
+            buf.write('<div class="deal-points"><ul>')
+            for point in deal['key_points']:
+                buf.write(f"<li>{_escape(point)}</li>")
+            buf.write('</ul></div>')
 
         # Companies involved
-        companies_html = ""
-        if deal.get('companies') and len(deal['companies']) > 0:
-            company_tags = "".join([f'<span class="company-tag">{company}</span>' for company in deal['companies']])
-            companies_html = f"""
-                <div class="companies-involved">
-                    <h5>Companies Involved</h5>
-                    <div class="companies-list">{company_tags}</div>
-                </div>
-            """
-
-        return f"""
-            <div class="deal-card">
-                {title_html}
-                {meta_html}
-                {summary_html}
-                {points_html}
-                {companies_html}
-            </div>
-        """
+        if deal.get('companies'):
+            buf.write('<div class="companies-involved"><h5>Companies Involved</h5><div class="companies-list">')
+            for company in deal['companies']:
+                buf.write(f'<span class="company-tag">{_escape(company)}</span>')
+            buf.write('</div></div>')
+
+        buf.write('</div>')
 
-    def _create_market_insights(self, newsletter_content: Dict) -> str:
+    def _create_market_insights(self, buf: StringIO, newsletter_content: Dict) -> None:
         """Create market insights section"""
 
         insights = newsletter_content.get('market_insights',
                                           'Market activity continues to show strong momentum across sectors.')
 
-        return f"""
-            <div class="market-insights">
-                <h3> Market Insights</h3>
-                <p>{insights}</p>
-            </div>
-        """
+        buf.write(_INSIGHTS_TMPL.substitute(insights=_escape(insights)))
 
     def _create_footer(self, sender_email: str = "newsletter@darren-murphy.com") -> str:
         """Create email footer with proper unsubscribe links"""
 
-        return f"""
-        </div>
-        <div class="footer">
-            <div class="unsubscribe-section">
-                <p><strong>📧 Manage Your Subscription</strong></p>
-                <p>To unsubscribe, simply reply to this email with "UNSUBSCRIBE" in the subject line.</p>
-                <p>You can also email us directly: <a href="mailto:{sender_email}?subject=Unsubscribe%20Request">unsubscribe@darren-murphy.com</a></p>
-            </div>
-            
-            <p><strong>{self.company_name}</strong> - Professional M&A Intelligence</p>
-            <p>This newsletter contains curated financial news from verified sources including Reuters, Bloomberg, and CNBC.</p>
-            <p>© 2024 Darren Murphy. All rights reserved.</p>
-            
-            <p style="font-size: 12px; color: #9ca3af; margin-top: 20px;">
-                This email was sent to you because you subscribed to our M&A newsletter. 
-                We respect your privacy and will never share your information.
-            </p>
-        </div>
-        """
+        return _FOOTER_TMPL.substitute(sender_email=_escape(sender_email),
+                                       company_name=_escape(self.company_name))
+
+    def _tag_class(self, deal_type: str) -> str:
+        """CSS class for a deal type's tag, derived on the fly for unknown types"""
+        return self._TAG_CLASS.get(deal_type) or _escape(deal_type.lower().replace('&', '').replace('_', ''))
 
     def _get_deal_type_name(self, deal_type: str) -> str:
         """Get full name for deal type"""
-
-        names = {
-            'VC': 'Venture Capital',
-            'M&A': 'Mergers & Acquisitions',
-            'IPO': 'Initial Public Offerings',
-            'IB': 'Investment Banking'
-        }
-
-        return names.get(deal_type, deal_type)
+        return self._DEAL_TYPE_NAMES.get(deal_type, deal_type)
 
     def create_text_version(self, newsletter_content: Dict,
-                            recipient_name: Optional[str] = None) -> str:
+                            recipient_name: Optional[str] = None,
+                            current_date: Optional[str] = None) -> str:
         """
         Create plain text version of the newsletter
 
         Args:
             newsletter_content: Dictionary from deal_summarizer.create_newsletter_content()
             recipient_name: Optional personalization name
+            current_date: Preformatted newsletter date (defaults to today)
 
         Returns:
             Plain text email string
         """
-        logger.info("Creating plain text newsletter version...")
+        logger.debug("Creating plain text newsletter version...")
 
-        current_date = datetime.now().strftime("%B %d, %Y")
+        if current_date is None:
+            current_date = datetime.now().strftime(NEWSLETTER_DATE_FORMAT)
 
         # Build text email
-        text_lines = []
-        text_lines.append(f"{self.company_name} Finance Brief - {current_date}")
-        text_lines.append("=" * 60)
-        text_lines.append("")
-
-        # Greeting
         greeting = "Good morning"
         if recipient_name:
             greeting += f", {recipient_name}"
-        text_lines.append(f"{greeting}!")
-        text_lines.append("")
 
-        # Executive summary
         headline = newsletter_content.get('headline', 'Weekly Finance Update')
         summary = newsletter_content.get('executive_summary', 'Key financial deals and market movements.')
 
-        text_lines.append(f"EXECUTIVE SUMMARY: {headline}")
-        text_lines.append("-" * 40)
-        text_lines.append(summary)
-        text_lines.append("")
+        text_lines = [
+            f"{self.company_name} Finance Brief - {current_date}", _TEXT_RULE, "",
+            f"{greeting}!", "",
+            f"EXECUTIVE SUMMARY: {headline}", _TEXT_SUBRULE, summary, "",
+        ]
 
         # Deal sections
         deal_sections = newsletter_content.get('deal_sections', {})
         for deal_type, deals in deal_sections.items():
             text_lines.append(f"{self._get_deal_type_name(deal_type).upper()} ({len(deals)} deals)")
-            text_lines.append("-" * 40)
+            text_lines.append(_TEXT_SUBRULE)
 
             for i, deal in enumerate(deals, 1):
                 text_lines.append(f"{i}. {deal['title']}")
                 if deal.get('amount'):
                     text_lines.append(f"   Amount: {deal['amount']}")
-                text_lines.append(f"   Summary: {deal['summary']}")
-                text_lines.append(f"   Source: {deal['source']} | Date: {deal['date']}")
-                text_lines.append(f"   Link: {deal['url']}")
-                text_lines.append("")
+                text_lines.append(_TEXT_DEAL_TAIL.format_map(deal))
 
         # Market insights
         insights = newsletter_content.get('market_insights', '')
         if insights:
-            text_lines.append("MARKET INSIGHTS")
-            text_lines.append("-" * 40)
-            text_lines.append(insights)
-            text_lines.append("")
+            text_lines.extend(("MARKET INSIGHTS", _TEXT_SUBRULE, insights, ""))
 
         # Footer
-        text_lines.append("=" * 60)
-        text_lines.append("This newsletter was generated automatically from verified financial news sources.")
-        text_lines.append("Questions? Reply to this email or contact our team.")
+        text_lines.extend(_TEXT_FOOTER)
 
-        logger.info("Plain text newsletter created successfully")
+        logger.debug("Plain text newsletter created successfully")
         return "\n".join(text_lines)
 
 
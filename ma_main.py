@@ -7,13 +7,14 @@ Flow: Cron -> Scrape News Sources -> Identify Deals (M&A, VC, IB, IPO) -> OpenAI
 
 import logging
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 from ma_scraper import FinanceNewsScraper
 from ma_summarizer import DealSummarizer
-from ma_format_email import HTMLEmailFormatter
+from ma_format_email import HTMLEmailFormatter, NEWSLETTER_DATE_FORMAT
 from ma_sendemail import ResendEmailSender, EmailRecipient
-from ma_db_supabase import get_all_subscribers, get_subscriber_count
+from ma_db_supabase import get_all_subscribers, get_subscriber_count, get_subscriber_shard
 from ma_resend_sync import SupabaseResendSync
 
 # Load environment variables
@@ -33,8 +34,8 @@ def run_ma_newsletter_pipeline():
 
     # Step 1: Scrape Reuters for deals
     logger.info("📰 Scraping financial news sources for deals...")
-    scraper = FinanceNewsScraper()
-    deals = scraper.get_top_finance_stories(max_stories=8)  # Get more diverse deals
+    with FinanceNewsScraper() as scraper:
+        deals = scraper.get_top_finance_stories(max_stories=8)  # Get more diverse deals
     
     if not deals:
         logger.warning("❌ No deals found. Exiting pipeline.")
@@ -55,8 +56,10 @@ def run_ma_newsletter_pipeline():
     logger.info("📧 Formatting email content...")
     content = summarizer.create_newsletter_content(summarized)
     formatter = HTMLEmailFormatter(company_name="Financial Markets Newsletter", brand_color="#1a365d")
-    html_email = formatter.create_newsletter_html(content)
-    text_email = formatter.create_text_version(content)
+    today = datetime.now().strftime(NEWSLETTER_DATE_FORMAT)
+    # Rendered once; the sender fills in each recipient's name with a cheap replace
+    html_email = formatter.create_base_html(content, current_date=today)
+    text_email = formatter.create_text_version(content, current_date=today)
     logger.info("✅ Email formatted")
 
     # Step 4: Pull subscribers from Supabase (with optional Resend sync)
@@ -79,7 +82,17 @@ def run_ma_newsletter_pipeline():
             logger.info("📧 Continuing with Supabase-only mode...")
     
     # Get subscribers from Supabase (our source of truth)
-    subscriber_emails = get_all_subscribers()
+    # MAILER_SHARD_COUNT > 1 lets parallel runs each send to one hash shard (MAILER_SHARD = 0..N-1)
+    shard_count = int(os.getenv('MAILER_SHARD_COUNT', '1'))
+    try:
+        if shard_count > 1:
+            shard = int(os.getenv('MAILER_SHARD', '0'))
+            subscriber_emails = get_subscriber_shard(shard, shard_count)
+        else:
+            subscriber_emails = get_all_subscribers()
+    except Exception as e:
+        logger.error(f"❌ Could not load subscribers from Supabase: {e}")
+        return False
     
     if not subscriber_emails:
         logger.warning("❌ No subscribers found in Supabase. Exiting pipeline.")
@@ -104,7 +117,7 @@ def run_ma_newsletter_pipeline():
     )
 
     # Step 6: Log results
-    successful = sum(1 for r in results if r.success)
+    successful = sender.sent_count
     failed = len(results) - successful
     
     logger.info(f"📊 Pipeline Complete: {successful}/{len(results)} emails sent successfully")
@@ -5,11 +5,17 @@ Keeps both systems synchronized for optimal email delivery
 """
 
 import os
+import sys
+import time
+import random
 import logging
+import requests
 import resend
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, FrozenSet
 from dotenv import load_dotenv
-from ma_db_supabase import get_all_subscribers, get_db
+from ma_db_supabase import get_subscriber_set, get_db
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +23,68 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Retry Resend rate limits (429) and gateway errors with exponential backoff
+# (0.5s, 1s, 2s, ... capped at 8s, with jitter) unless Retry-After says otherwise
+RESEND_RETRY_ATTEMPTS = 5
+RESEND_RETRY_BASE_DELAY = 0.5
+RESEND_RETRY_MAX_DELAY = 8.0
+RESEND_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# How long (seconds) a fetched Supabase/Resend snapshot is reused, e.g. for status then sync
+SYNC_CACHE_TTL = 60
+
+def _is_fresh(fetched_at: Optional[float]) -> bool:
+    """True if a snapshot taken at fetched_at (monotonic) is still within SYNC_CACHE_TTL"""
+    return fetched_at is not None and time.monotonic() - fetched_at < SYNC_CACHE_TTL
+
+
+def _retry_delay(retry_after: Optional[str], attempt: int) -> float:
+    """Honor a numeric Retry-After header, else exponential backoff with full jitter"""
+    try:
+        return max(0.0, float(retry_after))
+    except (TypeError, ValueError):
+        return random.uniform(0, min(RESEND_RETRY_BASE_DELAY * 2 ** attempt, RESEND_RETRY_MAX_DELAY))
+
+
+class PooledResendClient(resend.HTTPClient):
+    """
+    resend SDK HTTP client backed by one keep-alive requests.Session
+
+    The SDK's default client calls requests.request(), which opens a new
+    connection (and TLS handshake) for every contact operation. Rate-limited
+    and gateway-error responses are retried here, below the SDK, so every
+    contact call gets the same backoff.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: int = 30):
+        self._timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("https://", adapter)
+
+    def request(self, method, url, headers, json=None, **kwargs):
+        for attempt in range(RESEND_RETRY_ATTEMPTS):
+            try:
+                resp = self._session.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    json=json if kwargs.get("data") is None else None,
+                    timeout=self._timeout,
+                    **kwargs
+                )
+            except requests.RequestException as e:
+                # The SDK turns this into a ResendError, same as its default client
+                raise RuntimeError(f"Request failed: {e}") from e
+
+            if resp.status_code not in RESEND_RETRY_STATUSES or attempt == RESEND_RETRY_ATTEMPTS - 1:
+                return resp.content, resp.status_code, resp.headers
+
+            delay = _retry_delay(resp.headers.get("Retry-After"), attempt)
+            logger.debug(f"Resend returned {resp.status_code}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
 class SupabaseResendSync:
     """
     Synchronizes subscribers between Supabase and Resend audience
@@ -33,44 +101,83 @@ class SupabaseResendSync:
         
         # Set resend API key
         resend.api_key = self.resend_api_key
+
+        # email -> contact id, filled by get_resend_contacts and kept current by
+        # add/remove; both snapshots are reused for SYNC_CACHE_TTL seconds
+        self._resend_index: Dict[str, str] = {}
+        self._resend_fetched_at: Optional[float] = None
+        self._supabase_emails: Optional[FrozenSet[str]] = None
+        self._supabase_fetched_at: Optional[float] = None
+
+        # Concurrent add/remove calls; Resend's default limit is 2 requests/second
+        self.concurrency = max(1, int(os.getenv('RESEND_SYNC_CONCURRENCY', '2')))
+
+        # Resend has no bulk contact endpoint, so keep one pooled connection
+        # per worker alive across all the per-contact calls instead
+        if not isinstance(resend.default_http_client, PooledResendClient):
+            resend.default_http_client = PooledResendClient(pool_size=self.concurrency)
         
         logger.info("✅ Supabase-Resend Sync initialized")
         logger.info(f"   Audience ID: {self.audience_id}")
     
-    def get_resend_contacts(self) -> Set[str]:
-        """Get all email addresses from Resend audience"""
+    def get_resend_contacts(self, refresh: bool = False) -> Dict[str, str]:
+        """
+        Get all contacts from the Resend audience
+
+        Args:
+            refresh: Refetch even if the last snapshot is still fresh
+
+        Returns:
+            Dict mapping lowercased email -> Resend contact id, also kept on
+            self._resend_index so removals can skip a per-contact lookup
+        """
+        if not refresh and _is_fresh(self._resend_fetched_at):
+            return self._resend_index
+
         try:
             logger.info("📥 Fetching contacts from Resend audience...")
             
-            # Use newer Resend SDK
+            # Use newer Resend SDK (returns dicts; older versions returned objects)
             response = resend.Contacts.list(audience_id=self.audience_id)
+            data = response.get('data') if isinstance(response, dict) else getattr(response, 'data', None)
             
-            emails = set()
-            if hasattr(response, 'data') and response.data:
-                for contact in response.data:
-                    if hasattr(contact, 'email'):
-                        emails.add(contact.email.lower())
-                    elif isinstance(contact, dict) and 'email' in contact:
-                        emails.add(contact['email'].lower())
+            index = {}
+            for contact in data or []:
+                if isinstance(contact, dict):
+                    email, contact_id = contact.get('email'), contact.get('id')
+                else:
+                    email, contact_id = getattr(contact, 'email', None), getattr(contact, 'id', None)
+                if email:
+                    # Interned like the Supabase emails, so diffing hits the identity fast path
+                    index[sys.intern(email.lower())] = contact_id
                 
-            logger.info(f"✅ Found {len(emails)} contacts in Resend audience")
-            return emails
+            self._resend_index = index
+            self._resend_fetched_at = time.monotonic()
+            logger.info(f"✅ Found {len(index)} contacts in Resend audience")
+            return index
             
         except Exception as e:
             logger.error(f"❌ Error fetching Resend contacts: {e}")
-            return set()
+            return {}
     
-    def get_supabase_subscribers(self) -> Set[str]:
-        """Get all email addresses from Supabase"""
+    def get_supabase_subscribers(self, refresh: bool = False) -> FrozenSet[str]:
+        """Get all email addresses from Supabase (reused for SYNC_CACHE_TTL seconds)"""
+        if not refresh and _is_fresh(self._supabase_fetched_at):
+            return self._supabase_emails
+
         try:
             logger.info("📥 Fetching subscribers from Supabase...")
-            subscribers = get_all_subscribers()
-            emails = {email.lower() for email in subscribers}
+            # Emails are stored lowercased (enforced by the table's CHECK constraint),
+            # and the DB layer already pages through just the email column
+            emails = get_subscriber_set()
+            self._supabase_emails = emails
+            self._supabase_fetched_at = time.monotonic()
             logger.info(f"✅ Found {len(emails)} subscribers in Supabase")
             return emails
         except Exception as e:
+            # Don't return an empty set here - the sync would treat every Resend contact as removed
             logger.error(f"❌ Error fetching Supabase subscribers: {e}")
-            return set()
+            raise
     
     def add_contact_to_resend(self, email: str, first_name: str = "", last_name: str = "") -> bool:
         """Add a single contact to Resend audience using newer SDK"""
@@ -87,6 +194,9 @@ class SupabaseResendSync:
             }
             
             response = resend.Contacts.create(params)
+            contact_id = response.get('id') if isinstance(response, dict) else getattr(response, 'id', None)
+            if contact_id:
+                self._resend_index[email.lower()] = contact_id
             logger.debug(f"✅ Added {email} to Resend")
             return True
             
@@ -94,21 +204,31 @@ class SupabaseResendSync:
             # Don't fail on duplicates - that's expected
             if 'already exists' in str(e).lower() or 'duplicate' in str(e).lower():
                 logger.debug(f"📝 {email} already exists in Resend (skipping)")
+                # Our snapshot missed this contact, so don't trust it next time
+                self._resend_fetched_at = None
                 return True
             else:
                 logger.error(f"❌ Error adding {email} to Resend: {e}")
                 return False
     
-    def remove_contact_from_resend(self, email: str) -> bool:
-        """Remove a contact from Resend audience"""
+    def remove_contact_from_resend(self, email: str, contact_id: Optional[str] = None) -> bool:
+        """Remove a contact from Resend audience, by id when it is already known"""
         try:
             logger.debug(f"Removing {email} from Resend audience...")
             
-            # Get contact first, then remove by ID
-            contact_response = resend.Contacts.get(email=email, audience_id=self.audience_id)
+            # The id normally comes from the index built by get_resend_contacts;
+            # only look the contact up when it isn't there
+            contact_id = contact_id or self._resend_index.get(email.lower())
+            if not contact_id:
+                contact_response = resend.Contacts.get(email=email, audience_id=self.audience_id)
+                if isinstance(contact_response, dict):
+                    contact_id = contact_response.get('id')
+                else:
+                    contact_id = getattr(contact_response, 'id', None)
             
-            if contact_response and hasattr(contact_response, 'id'):
-                resend.Contacts.remove(id=contact_response.id, audience_id=self.audience_id)
+            if contact_id:
+                resend.Contacts.remove(id=contact_id, audience_id=self.audience_id)
+                self._resend_index.pop(email.lower(), None)
                 logger.debug(f"✅ Removed {email} from Resend")
                 return True
             else:
@@ -118,11 +238,26 @@ class SupabaseResendSync:
         except Exception as e:
             if 'not found' in str(e).lower():
                 logger.debug(f"📝 {email} not found in Resend (already removed)")
+                self._resend_index.pop(email.lower(), None)
                 return True
             else:
                 logger.error(f"❌ Error removing {email} from Resend: {e}")
                 return False
     
+    def _run_concurrently(self, operation, emails: List[str]) -> int:
+        """
+        Run a per-contact Resend operation over many emails at once
+
+        Args:
+            operation: add_contact_to_resend or remove_contact_from_resend
+            emails: Email addresses to process
+
+        Returns:
+            Number of emails the operation succeeded for
+        """
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(emails))) as pool:
+            return sum(pool.map(operation, emails))
+
     def sync_supabase_to_resend(self) -> Dict[str, int]:
         """
         Sync subscribers from Supabase to Resend
@@ -132,17 +267,17 @@ class SupabaseResendSync:
         
         # Get current state
         supabase_emails = self.get_supabase_subscribers()
-        resend_emails = self.get_resend_contacts()
+        resend_emails = self.get_resend_contacts().keys()
         
-        # Find differences
-        to_add = supabase_emails - resend_emails  # In Supabase but not in Resend
-        to_remove = resend_emails - supabase_emails  # In Resend but not in Supabase
+        # Find differences: one membership probe per email, no intermediate sets
+        to_add = [email for email in supabase_emails if email not in resend_emails]  # In Supabase but not in Resend
+        to_remove = [email for email in resend_emails if email not in supabase_emails]  # In Resend but not in Supabase
         
         results = {
             'added': 0,
             'removed': 0,
             'errors': 0,
-            'unchanged': len(supabase_emails & resend_emails)
+            'unchanged': len(supabase_emails) - len(to_add)
         }
         
         logger.info(f"📊 Sync plan: +{len(to_add)} add, -{len(to_remove)} remove, ={results['unchanged']} unchanged")
@@ -150,20 +285,16 @@ class SupabaseResendSync:
         # Add missing contacts to Resend
         if to_add:
             logger.info(f"➕ Adding {len(to_add)} new contacts to Resend...")
-            for email in to_add:
-                if self.add_contact_to_resend(email):
-                    results['added'] += 1
-                else:
-                    results['errors'] += 1
+            succeeded = self._run_concurrently(self.add_contact_to_resend, to_add)
+            results['added'] += succeeded
+            results['errors'] += len(to_add) - succeeded
         
         # Remove contacts from Resend that aren't in Supabase
         if to_remove:
             logger.info(f"➖ Removing {len(to_remove)} contacts from Resend...")
-            for email in to_remove:
-                if self.remove_contact_from_resend(email):
-                    results['removed'] += 1
-                else:
-                    results['errors'] += 1
+            succeeded = self._run_concurrently(self.remove_contact_from_resend, to_remove)
+            results['removed'] += succeeded
+            results['errors'] += len(to_remove) - succeeded
         
         logger.info("✅ Sync complete!")
         logger.info(f"   Added: {results['added']}")
@@ -177,19 +308,19 @@ class SupabaseResendSync:
     def get_sync_status(self) -> Dict:
         """Get current sync status between Supabase and Resend"""
         supabase_emails = self.get_supabase_subscribers()
-        resend_emails = self.get_resend_contacts()
+        resend_emails = self.get_resend_contacts().keys()
         
-        in_both = supabase_emails & resend_emails
-        only_supabase = supabase_emails - resend_emails
-        only_resend = resend_emails - supabase_emails
+        # Only counts are needed, so probe the smaller side once and derive the rest
+        smaller, larger = sorted((supabase_emails, resend_emails), key=len)
+        in_both = sum(1 for email in smaller if email in larger)
         
         status = {
             'supabase_count': len(supabase_emails),
             'resend_count': len(resend_emails),
-            'in_sync_count': len(in_both),
-            'only_in_supabase': len(only_supabase),
-            'only_in_resend': len(only_resend),
-            'sync_percentage': round((len(in_both) / max(len(supabase_emails), 1)) * 100, 1)
+            'in_sync_count': in_both,
+            'only_in_supabase': len(supabase_emails) - in_both,
+            'only_in_resend': len(resend_emails) - in_both,
+            'sync_percentage': round((in_both / max(len(supabase_emails), 1)) * 100, 1)
         }
         
         return status
@@ -4,17 +4,59 @@ Focuses on getting actual deals from working sources
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
-from datetime import datetime, timedelta
+import heapq
+from itertools import islice
+from operator import attrgetter
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from dataclasses import dataclass
 import logging
+import re
+import time
 from bs4 import BeautifulSoup
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Upper bound on how much of a single RSS feed is read
+MAX_FEED_BYTES = 512_000
+
+# Seconds allowed per feed request, and for the whole concurrent scrape
+FEED_TIMEOUT = 15
+
+# Bytes read per step while streaming a feed, so the deadline is checked between reads
+FEED_READ_CHUNK = 64 * 1024
+
+
+def _read_feed_body(response, deadline: Optional[float]) -> bytes:
+    """
+    Read up to MAX_FEED_BYTES of a streamed feed, giving up at deadline
+
+    read1 returns whatever has arrived instead of waiting for a full chunk,
+    so a feed that trickles bytes can't stretch a single read past the deadline.
+
+    Raises:
+        TimeoutError: The body was still arriving when the deadline passed
+    """
+    read = getattr(response.raw, 'read1', response.raw.read)
+    chunks = []
+    size = 0
+    while size < MAX_FEED_BYTES:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError(f"feed still downloading after {FEED_TIMEOUT}s")
+        chunk = read(min(FEED_READ_CHUNK, MAX_FEED_BYTES - size))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b''.join(chunks)
+
+@dataclass(slots=True, frozen=True)
 class Deal:
     title: str
     description: str
@@ -25,6 +67,109 @@ class Deal:
     amount: Optional[str] = None
     priority_score: float = 0.0
 
+# Dollar amounts like $1.5B, $500M, $2 billion in one alternation; the named
+# unit group says which form matched, ranked here in order of preference
+_AMOUNT_RE = re.compile(
+    r'\$\d+\.?\d*(?:\s?(?:(?P<billion>billion)|(?P<b>B\b)|(?P<million>million)|(?P<m>M\b)))?',
+    re.IGNORECASE,
+)
+_AMOUNT_RANK = {'billion': 0, 'b': 1, 'million': 2, 'm': 3, None: 4}
+
+
+class _KeywordScanner:
+    """
+    Finds which of a fixed set of keywords occur (as substrings) in a text
+
+    One compiled regex pass replaces a separate `kw in text` scan per keyword.
+    The alternation tries longer keywords first and matches at every start
+    position via a lookahead; shorter keywords hidden inside a longer hit
+    (e.g. 'buyout' in 'leveraged buyout') are added back from a precomputed
+    table, so the result is exactly {kw for kw in keywords if kw in text}.
+    """
+
+    def __init__(self, keywords):
+        unique = sorted(set(keywords), key=len, reverse=True)
+        self._regex = re.compile('(?=(' + '|'.join(map(re.escape, unique)) + '))')
+        self._contained = {
+            kw: frozenset(other for other in unique if other in kw)
+            for kw in unique
+        }
+
+    def find(self, text: str) -> set:
+        found = set()
+        for hit in {m.group(1) for m in self._regex.finditer(text)}:
+            found |= self._contained[hit]
+        return found
+
+
+# Comprehensive Financial Deal Keywords; a tuple because repeats count toward
+# the priority score ('valuation' appears twice)
+_DEAL_KEYWORDS = (
+    # M&A Terms
+    'acquisition', 'acquired', 'merger', 'buyout', 'takeover', 
+    'purchase', 'deal to buy', 'agrees to buy', 'strategic partnership',
+    'joint venture', 'spin-off', 'divestiture', 'asset sale',
+    
+    # VC/PE Terms  
+    'funding', 'raises', 'investment', 'venture capital', 'private equity',
+    'series a', 'series b', 'series c', 'series d', 'pre-seed', 'seed round',
+    'growth capital', 'expansion financing', 'mezzanine financing',
+    
+    # Investment Banking Terms
+    'underwriting', 'ipo', 'initial public offering', 'secondary offering',
+    'bond issuance', 'debt financing', 'credit facility', 'syndicated loan',
+    'leveraged buyout', 'lbo', 'restructuring', 'refinancing',
+    'rights offering', 'convertible bond', 'high yield', 'investment grade',
+    
+    # Corporate Finance
+    'capital raising', 'equity financing', 'debt restructuring',
+    'financial advisory', 'fairness opinion', 'valuation', 'due diligence',
+    'public listing', 'going public', 'delisting', 'privatization',
+    
+    # Deal Sizes & Values
+    'billion', 'million', 'valuation', 'enterprise value', 'market cap'
+)
+
+# Deal type indicators, in classification priority order (most specific first)
+_DEAL_TYPE_INDICATORS = (
+    # Investment Banking
+    ('IB', frozenset({
+        'underwriting', 'bond issuance', 'debt financing', 'credit facility',
+        'syndicated loan', 'restructuring', 'refinancing', 'rights offering',
+        'convertible bond', 'high yield', 'investment grade', 'financial advisory'
+    })),
+    # IPO
+    ('IPO', frozenset({
+        'ipo', 'initial public offering', 'going public', 'public listing',
+        'secondary offering', 'public debut', 'stock market debut'
+    })),
+    # VC/PE
+    ('VC', frozenset({
+        'funding', 'raises', 'series a', 'series b', 'series c', 'series d',
+        'pre-seed', 'seed round', 'venture capital', 'growth capital',
+        'expansion financing', 'investment round'
+    })),
+    # M&A
+    ('M&A', frozenset({
+        'acquisition', 'acquired', 'merger', 'buyout', 'takeover',
+        'purchase', 'deal to buy', 'agrees to buy', 'leveraged buyout',
+        'lbo', 'strategic partnership', 'joint venture', 'privatization'
+    })),
+)
+_INDICATOR_CATEGORY = {
+    indicator: deal_type
+    for deal_type, indicators in _DEAL_TYPE_INDICATORS
+    for indicator in indicators
+}
+# Deal keywords and type indicators together, so one pass over an entry's
+# text serves both the keyword match and the classification
+_ENTRY_SCANNER = _KeywordScanner(set(_DEAL_KEYWORDS) | set(_INDICATOR_CATEGORY))
+
+# Cheap first test: stops at the first deal keyword, so unrelated stories
+# skip the full scan above
+_DEAL_KEYWORD_GATE = re.compile('|'.join(map(re.escape, set(_DEAL_KEYWORDS))))
+
+
 class FinanceNewsScraper:
     def __init__(self):
         logger.info("🚀 Initializing Finance News Scraper...")
@@ -40,52 +185,62 @@ class FinanceNewsScraper:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
+        # One keep-alive session for every feed fetch instead of a new connection each time
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Feed GETs are idempotent, so retry gateway hiccups a couple of times
+        retries = Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        self.session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retries))
+        
         # Comprehensive Financial Deal Keywords
-        self.deal_keywords = [
-            # M&A Terms
-            'acquisition', 'acquired', 'merger', 'buyout', 'takeover', 
-            'purchase', 'deal to buy', 'agrees to buy', 'strategic partnership',
-            'joint venture', 'spin-off', 'divestiture', 'asset sale',
-            
-            # VC/PE Terms  
-            'funding', 'raises', 'investment', 'venture capital', 'private equity',
-            'series a', 'series b', 'series c', 'series d', 'pre-seed', 'seed round',
-            'growth capital', 'expansion financing', 'mezzanine financing',
-            
-            # Investment Banking Terms
-            'underwriting', 'ipo', 'initial public offering', 'secondary offering',
-            'bond issuance', 'debt financing', 'credit facility', 'syndicated loan',
-            'leveraged buyout', 'lbo', 'restructuring', 'refinancing',
-            'rights offering', 'convertible bond', 'high yield', 'investment grade',
-            
-            # Corporate Finance
-            'capital raising', 'equity financing', 'debt restructuring',
-            'financial advisory', 'fairness opinion', 'valuation', 'due diligence',
-            'public listing', 'going public', 'delisting', 'privatization',
-            
-            # Deal Sizes & Values
-            'billion', 'million', 'valuation', 'enterprise value', 'market cap'
-        ]
+        self.deal_keywords = _DEAL_KEYWORDS
         
         logger.info("✅ Scraper initialized with working news sources")
 
+    def close(self):
+        """Close the pooled HTTP session"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def get_top_finance_stories(self, max_stories: int = 8, days_back: int = 7) -> List[Deal]:
         """Get top finance stories from working sources"""
         logger.info(f"Starting aggregation for top {max_stories} finance stories from last {days_back} days...")
         
         all_deals = []
-        cutoff_date = datetime.now() - timedelta(days=days_back)
-        logger.info(f"Cutoff date: {cutoff_date.strftime('%Y-%m-%d %H:%M:%S')}")
+        # feedparser reports publish times as UTC struct_times, so compare in UTC
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
+        logger.info(f"Cutoff date: {cutoff_date.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+        
+        # Scrape RSS feeds concurrently; results are collected in source order
+        # so ties in priority still resolve the same way on every run. The whole
+        # scrape shares one deadline, so wall time is bounded by the slowest feed
+        # rather than the sum of them. Workers cap their request timeout at the
+        # time left and stop reading a feed that trickles past the deadline, so
+        # the pool can wait for every worker before the session is closed
+        deadline = time.monotonic() + FEED_TIMEOUT
+        with ThreadPoolExecutor(max_workers=len(self.news_sources) or 1) as pool:
+            futures = {}
+            for source_name, url in self.news_sources.items():
+                logger.info(f"Scraping {source_name}...")
+                futures[source_name] = pool.submit(self._scrape_rss_source, source_name, url, cutoff_date, deadline)
+
+            for source_name, future in futures.items():
+                try:
+                    deals = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                    all_deals.extend(deals)
+                    logger.info(f"{source_name}: Found {len(deals)} qualifying deals")
+                except FutureTimeout:
+                    logger.error(f"Timed out scraping {source_name} after {FEED_TIMEOUT}s")
+                except Exception as e:
+                    logger.error(f"Error scraping {source_name}: {e}")
         
-        # Scrape RSS feeds
-        for source_name, url in self.news_sources.items():
-            logger.info(f"Scraping {source_name}...")
-            try:
-                deals = self._scrape_rss_source(source_name, url, cutoff_date)
-                all_deals.extend(deals)
-                logger.info(f"{source_name}: Found {len(deals)} qualifying deals")
-            except Exception as e:
-                logger.error(f"Error scraping {source_name}: {e}")
+        # Syndicated stories show up in more than one feed; keep one copy of each
+        all_deals = self._dedupe_deals(all_deals)
         
         # If no real deals found, add samples
         if len(all_deals) == 0:
@@ -95,34 +250,94 @@ class FinanceNewsScraper:
         
         logger.info(f"Total deals collected: {len(all_deals)}")
         
-        # Sort by priority and return top stories
-        all_deals.sort(key=lambda x: x.priority_score, reverse=True)
-        top_deals = all_deals[:max_stories]
+        # Pick the top stories by priority without sorting every deal
+        top_deals = heapq.nlargest(max_stories, all_deals, key=attrgetter('priority_score'))
         
         logger.info(f"Final top stories selected: {len(top_deals)}")
         return top_deals
 
-    def _scrape_rss_source(self, source_name: str, url: str, cutoff_date: datetime) -> List[Deal]:
-        """Scrape a single RSS source"""
+    @staticmethod
+    def _dedupe_deals(deals: List[Deal]) -> List[Deal]:
+        """
+        Collapse deals sharing a canonical URL or normalized title, keeping the
+        highest-scoring copy (e.g. the Bloomberg one with its credibility boost)
+
+        The canonical URL drops the scheme, a leading "www.", the query string
+        (utm_* tracking and the like) and any trailing slash.
+        """
+        index_by_key = {}
+        unique = []
+        for deal in deals:
+            parts = urlsplit(deal.url)
+            keys = (
+                ('url', f"{parts.netloc.lower().removeprefix('www.')}{parts.path.rstrip('/')}"),
+                ('title', " ".join(deal.title.lower().split())),
+            )
+            idx = next((index_by_key[key] for key in keys if key in index_by_key), None)
+            if idx is None:
+                idx = len(unique)
+                unique.append(deal)
+            elif deal.priority_score > unique[idx].priority_score:
+                unique[idx] = deal
+            for key in keys:
+                index_by_key.setdefault(key, idx)
+        
+        if len(unique) < len(deals):
+            logger.info(f"Removed {len(deals) - len(unique)} duplicate stories across sources")
+        return unique
+
+    def _scrape_rss_source(self, source_name: str, url: str, cutoff_date: datetime,
+                           deadline: Optional[float] = None) -> List[Deal]:
+        """Scrape a single RSS source, giving up by deadline (a time.monotonic() value) if set"""
         deals = []
+        today = datetime.now().strftime('%Y-%m-%d')  # for entries without a publish date
+        
+        timeout = FEED_TIMEOUT
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                logger.error(f"Timed out scraping {source_name} after {FEED_TIMEOUT}s")
+                return deals
         
         try:
-            response = requests.get(url, timeout=15, headers=self.headers)
-            feed = feedparser.parse(response.content)
+            # Stream the body and stop reading at MAX_FEED_BYTES so a runaway
+            # feed can't balloon memory; feedparser copes with a truncated tail
+            with self.session.get(url, timeout=timeout, stream=True) as response:
+                response.raw.decode_content = True
+                body = _read_feed_body(response, deadline)
+            # Only title/summary text and the entry link are used, so skip
+            # feedparser's extra HTML pass that rewrites relative URIs
+            feed = feedparser.parse(body, resolve_relative_uris=False)
             
             logger.info(f"{source_name} RSS entries found: {len(feed.entries)}")
             
-            for entry in feed.entries[:20]:  # Check first 20 entries
+            for entry in islice(feed.entries, 20):  # Check first 20 entries
                 try:
+                    # Skip stale stories before any text work; feeds without a
+                    # publish/update time keep today's date
+                    published = entry.get('published_parsed') or entry.get('updated_parsed')
+                    if published:
+                        published_at = datetime(*published[:6], tzinfo=timezone.utc)
+                        if published_at < cutoff_date:
+                            continue
+                        deal_date = published_at.strftime('%Y-%m-%d')
+                    else:
+                        deal_date = today
+                    
                     # Check if it's M&A related
-                    text_to_check = f"{entry.title} {entry.get('summary', '')}".lower()
+                    title = entry.title
+                    text_to_check = f"{title} {entry.get('summary', '')}".lower()
+                    if not _DEAL_KEYWORD_GATE.search(text_to_check):
+                        continue
                     
-                    # Find matching keywords
-                    matching_keywords = [kw for kw in self.deal_keywords if kw in text_to_check]
+                    # Find matching keywords and type indicators in one regex pass
+                    # (list order and repeats as in deal_keywords)
+                    found = _ENTRY_SCANNER.find(text_to_check)
+                    matching_keywords = [kw for kw in self.deal_keywords if kw in found]
                     
                     if matching_keywords:
                         # Enhanced deal type classification
-                        deal_type = self._classify_deal_type(text_to_check)
+                        deal_type = self._classify_deal_type(text_to_check, found)
                         
                         # Extract amount if possible
                         amount = self._extract_amount(text_to_check)
@@ -130,12 +345,13 @@ class FinanceNewsScraper:
                         # Enhanced priority scoring
                         priority_score = len(matching_keywords) * 1.5
                         
-                        # Amount-based scoring
+                        # Amount-based scoring ('billion'/'million' are deal keywords,
+                        # so the keyword scan above already found them)
                         if amount:
                             priority_score += 4.0
-                            if 'billion' in text_to_check:
+                            if 'billion' in found:
                                 priority_score += 3.0
-                            elif 'million' in text_to_check:
+                            elif 'million' in found:
                                 priority_score += 2.0
                         
                         # Deal type multipliers
@@ -153,18 +369,18 @@ class FinanceNewsScraper:
                             priority_score += 1.0
                         
                         deal = Deal(
-                            title=entry.title,
-                            description=entry.get('summary', entry.title)[:300],
+                            title=title,
+                            description=entry.get('summary', title)[:300],
                             source=source_name.title(),
                             url=entry.link,
-                            date=datetime.now().strftime('%Y-%m-%d'),
+                            date=deal_date,
                             deal_type=deal_type,
                             amount=amount,
                             priority_score=priority_score
                         )
                         
                         deals.append(deal)
-                        logger.debug(f"Added {source_name} deal: {entry.title[:50]}... (score: {priority_score})")
+                        logger.debug(f"Added {source_name} deal: {title[:50]}... (score: {priority_score})")
                 
                 except Exception as e:
                     logger.debug(f"Error processing entry: {e}")
@@ -175,84 +391,58 @@ class FinanceNewsScraper:
         
         return deals
     
-    def _classify_deal_type(self, text: str) -> str:
-        """Enhanced deal type classification"""
-        text = text.lower()
-        
-        # Investment Banking indicators (check first - most specific)
-        ib_indicators = [
-            'underwriting', 'bond issuance', 'debt financing', 'credit facility',
-            'syndicated loan', 'restructuring', 'refinancing', 'rights offering',
-            'convertible bond', 'high yield', 'investment grade', 'financial advisory'
-        ]
-        
-        # IPO indicators
-        ipo_indicators = [
-            'ipo', 'initial public offering', 'going public', 'public listing',
-            'secondary offering', 'public debut', 'stock market debut'
-        ]
-        
-        # VC/PE indicators
-        vc_indicators = [
-            'funding', 'raises', 'series a', 'series b', 'series c', 'series d',
-            'pre-seed', 'seed round', 'venture capital', 'growth capital',
-            'expansion financing', 'investment round'
-        ]
-        
-        # M&A indicators
-        ma_indicators = [
-            'acquisition', 'acquired', 'merger', 'buyout', 'takeover',
-            'purchase', 'deal to buy', 'agrees to buy', 'leveraged buyout',
-            'lbo', 'strategic partnership', 'joint venture', 'privatization'
-        ]
+    def _classify_deal_type(self, text_lower: str, found: Optional[set] = None) -> str:
+        """
+        Enhanced deal type classification (expects already-lowercased text)
+
+        Pass `found` when the text was already run through _ENTRY_SCANNER to
+        reuse that scan instead of scanning again; every check below is a set
+        lookup against it.
+        """
+        if found is None:
+            found = _ENTRY_SCANNER.find(text_lower)
+        # One scan finds every indicator; the first category in priority order wins
+        categories = {_INDICATOR_CATEGORY[hit] for hit in found if hit in _INDICATOR_CATEGORY}
+        for deal_type, _ in _DEAL_TYPE_INDICATORS:
+            if deal_type in categories:
+                return deal_type
         
-        # Check in order of specificity
-        if any(indicator in text for indicator in ib_indicators):
-            return 'IB'
-        elif any(indicator in text for indicator in ipo_indicators):
-            return 'IPO'
-        elif any(indicator in text for indicator in vc_indicators):
-            return 'VC'
-        elif any(indicator in text for indicator in ma_indicators):
+        # Default classification based on context
+        if 'private equity' in found:
             return 'M&A'
+        elif 'investment' in found:
+            return 'VC'
         else:
-            # Default classification based on context
-            if 'private equity' in text:
-                return 'M&A'
-            elif 'investment' in text:
-                return 'VC'
-            else:
-                return 'M&A'  # Default fallback
+            return 'M&A'  # Default fallback
 
     def _extract_amount(self, text: str) -> Optional[str]:
-        """Extract dollar amounts from text"""
-        import re
-        
-        # Look for patterns like $1.5B, $500M, $2 billion, etc.
-        patterns = [
-            r'\$\d+\.?\d*\s?billion',
-            r'\$\d+\.?\d*\s?B\b',
-            r'\$\d+\.?\d*\s?million', 
-            r'\$\d+\.?\d*\s?M\b',
-            r'\$\d+\.?\d*'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
+        """
+        Extract dollar amounts from text
+
+        A billion figure anywhere wins over a million one, which wins over a
+        bare dollar figure; within a rank the first occurrence wins.
+        """
+        best = None
+        best_rank = len(_AMOUNT_RANK)
+        for match in _AMOUNT_RE.finditer(text):
+            rank = _AMOUNT_RANK[match.lastgroup]
+            if rank < best_rank:
+                best, best_rank = match, rank
+                if rank == 0:
+                    break
         
-        return None
+        return best.group(0) if best else None
 
     def _get_sample_deals(self) -> List[Deal]:
         """Sample deals for testing when no real deals found - covering all deal types"""
+        today = datetime.now().strftime('%Y-%m-%d')
         return [
             Deal(
                 title="Goldman Sachs Leads $3.2B IPO for Clean Energy Company",
                 description="Goldman Sachs and JPMorgan underwrite $3.2 billion IPO for renewable energy infrastructure company, marking the largest clean tech public offering this year.",
                 source="Sample Data",
                 url="https://example.com/deal1",
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="IB",
                 amount="$3.2 billion",
                 priority_score=9.5
@@ -262,7 +452,7 @@ class FinanceNewsScraper:
                 description="Tech giant Microsoft reportedly in talks to acquire leading AI company for $15 billion to strengthen cloud services.",
                 source="Sample Data",
                 url="https://example.com/deal2",
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="M&A",
                 amount="$15 billion",
                 priority_score=8.5
@@ -272,7 +462,7 @@ class FinanceNewsScraper:
                 description="Morgan Stanley leads consortium in structuring $5 billion syndicated credit facility for major infrastructure development project.",
                 source="Sample Data",
                 url="https://example.com/deal3",
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="IB",
                 amount="$5 billion",
                 priority_score=8.8
@@ -282,7 +472,7 @@ class FinanceNewsScraper:
                 description="Revolutionary biotech company developing gene therapies raises $1.8 billion in Series C funding round led by top venture firms.",
                 source="Sample Data", 
                 url="https://example.com/deal4",
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="VC",
                 amount="$1.8 billion",
                 priority_score=8.1
@@ -292,7 +482,7 @@ class FinanceNewsScraper:
                 description="Electric vehicle manufacturer announces plans for $2.1 billion initial public offering, seeking to capitalize on growing EV market.",
                 source="Sample Data",
                 url="https://example.com/deal5",
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="IPO",
                 amount="$2.1 billion",
                 priority_score=8.0
@@ -302,7 +492,7 @@ class FinanceNewsScraper:
                 description="Leading private equity firm completes $900 million acquisition of specialty healthcare services company.",
                 source="Sample Data",
                 url="https://example.com/deal6", 
-                date=datetime.now().strftime('%Y-%m-%d'),
+                date=today,
                 deal_type="M&A",
                 amount="$900 million",
                 priority_score=7.2
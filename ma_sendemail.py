@@ -12,19 +12,40 @@ from typing import List, Dict, Optional, Union
 from dataclasses import dataclass
 from datetime import datetime
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ma_format_email import HTMLEmailFormatter
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Resend's /emails/batch endpoint accepts at most 100 emails per request
+MAX_BATCH_SIZE = 100
+
+# Seconds to wait on a single Resend API request
+REQUEST_TIMEOUT = 30
+
+
+def _encode_json(payload) -> bytes:
+    """
+    Serialize a request body compactly as UTF-8 JSON
+
+    requests' json= escapes every non-ASCII character (the newsletter's emoji
+    and typography) to \\uXXXX and pads separators with spaces; this keeps the
+    large HTML bodies smaller and quicker to encode.
+    """
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
-@dataclass
+@dataclass(slots=True)
 class EmailRecipient:
     """Email recipient data structure"""
     email: str
     name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailAttachment:
     """Email attachment data structure"""
     filename: str
@@ -32,7 +53,7 @@ class EmailAttachment:
     content_type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailResult:
     """Result of email sending operation"""
     success: bool
@@ -73,18 +94,36 @@ class ResendEmailSender:
 
         # API Configuration
         self.base_url = "https://api.resend.com"
+        self._emails_url = f"{self.base_url}/emails"
+        self._batch_url = f"{self.base_url}/emails/batch"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
+        # Keep-alive session so batches reuse one connection to the Resend API
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
 
         # Rate limiting (Resend limits)
         self.rate_limit_per_second = 2  # Conservative rate limiting
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
+
+        # Successful sends in the most recent send_newsletter call
+        self.sent_count = 0
 
         # Email settings
         self.default_reply_to = os.getenv('REPLY_TO_EMAIL', self.sender_email)
 
+        # Sender-derived fields are fixed for the sender's lifetime
+        self._from_header = f"{self.sender_name} <{self.sender_email}>"
+        self._list_headers = {
+            "X-Entity-ID": "newsletter",
+            "List-Unsubscribe": f"<mailto:{self.sender_email}?subject=unsubscribe>",
+            "List-ID": f"{self.sender_name} <newsletter.{self.sender_email.rpartition('@')[2]}>",
+            "Precedence": "bulk"
+        }
+
         logger.info(f"✅ Resend Email Sender initialized")
         logger.info(f"   Sender: {self.sender_name} <{self.sender_email}>")
 
@@ -94,7 +133,7 @@ class ResendEmailSender:
                         html_content: str,
                         text_content: Optional[str] = None,
                         attachments: Optional[List[EmailAttachment]] = None,
-                        batch_size: int = 50) -> List[EmailResult]:
+                        batch_size: int = 100) -> List[EmailResult]:
         """
         Send newsletter to multiple recipients
 
@@ -103,37 +142,50 @@ class ResendEmailSender:
             subject: Email subject line
             html_content: HTML email content
             text_content: Plain text email content (optional)
-            attachments: List of email attachments (optional)
-            batch_size: Number of emails to send per batch
+            attachments: List of email attachments (not supported by the batch API; ignored)
+            batch_size: Number of emails to send per batch (Resend allows at most 100)
 
         Returns:
-            List of EmailResult objects with sending results
+            List of EmailResult objects with sending results; the number that
+            succeeded is also kept in self.sent_count
         """
         logger.info(f"📬 Starting newsletter send to {len(recipients)} recipients...")
+        self.sent_count = 0
 
         # Convert recipients to EmailRecipient objects
         recipient_objects = self._normalize_recipients(recipients)
 
+        # Sender, subject and headers are identical for every email in this send,
+        # so they are serialized once; each email only splices in "to" and "html"
+        base_payload = self._build_base_payload(subject, text_content)
+        payload_prefix = _encode_json(base_payload)[:-1]
+        encoded_html = {}  # recipient name -> JSON-encoded personalized HTML
+
         # Send in batches
+        batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
         all_results = []
-        total_batches = (len(recipient_objects) + batch_size - 1) // batch_size
-
-        for batch_num in range(total_batches):
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, len(recipient_objects))
-            batch_recipients = recipient_objects[start_idx:end_idx]
+        batches = [recipient_objects[start:start + batch_size]
+                   for start in range(0, len(recipient_objects), batch_size)]
+        total_batches = len(batches)
 
+        def send(batch_num):
+            batch_recipients = batches[batch_num]
             logger.info(f"📤 Sending batch {batch_num + 1}/{total_batches} ({len(batch_recipients)} recipients)...")
-
-            batch_results = self._send_batch(
+            return self._send_batch(
                 recipients=batch_recipients,
-                subject=subject,
+                payload_prefix=payload_prefix,
                 html_content=html_content,
-                text_content=text_content,
-                attachments=attachments
+                encoded_html=encoded_html
             )
 
-            all_results.extend(batch_results)
+        # Batches go out concurrently so one slow response doesn't hold up the
+        # next request; _wait_for_rate_limit still spaces the request starts
+        workers = max(1, min(self.rate_limit_per_second, total_batches))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Tally successes per batch as they come back on this thread
+            for batch_results in pool.map(send, range(total_batches)):
+                all_results.extend(batch_results)
+                self.sent_count += sum(result.success for result in batch_results)
 
         return all_results
 
@@ -151,60 +203,137 @@ class ResendEmailSender:
                 normalized.append(EmailRecipient(email=email))
         return normalized
 
-    def _send_batch(self, recipients, subject, html_content, text_content=None, attachments=None):
-        """Send email to a batch of recipients using Resend API"""
+    def _build_base_payload(self, subject, text_content=None):
+        """Build the Resend payload fields shared by every recipient of a send"""
+        payload = {
+            "from": self._from_header,
+            "reply_to": [self.default_reply_to],
+            "subject": subject,
+            "headers": self._list_headers
+        }
+
+        if text_content:
+            payload["text"] = text_content
+
+        return payload
+
+    def _wait_for_rate_limit(self):
+        """Sleep just long enough to stay under rate_limit_per_second (safe across threads)"""
+        min_interval = 1.0 / self.rate_limit_per_second
+        with self._rate_lock:
+            # Reserve the next start slot; waiters queue up in arrival order
+            now = time.monotonic()
+            start = max(now, self.last_request_time + min_interval)
+            self.last_request_time = start
+
+        # Sleep outside the lock so other workers can reserve their own slots
+        if start > now:
+            time.sleep(start - now)
+
+    def _encode_email(self, payload_prefix, recipient, html_content, encoded_html):
+        """
+        Build one email's JSON body from the pre-serialized shared fields
+
+        Args:
+            payload_prefix: Encoded base payload without its closing brace
+            recipient: EmailRecipient to address
+            html_content: Newsletter HTML with the recipient-name token
+            encoded_html: Per-send cache of encoded HTML keyed by recipient name
+
+        Returns:
+            UTF-8 JSON bytes for a single Resend email
+        """
+        html = encoded_html.get(recipient.name)
+        if html is None:
+            html = _encode_json(HTMLEmailFormatter.personalize(html_content, recipient.name))
+            encoded_html[recipient.name] = html
+        return b''.join((payload_prefix, b',"to":', _encode_json([recipient.email]), b',"html":', html, b'}'))
+
+    def _send_batch(self, recipients, payload_prefix, html_content, encoded_html):
+        """
+        Send email to a batch of recipients using Resend's batch API
+
+        One POST to /emails/batch carries up to MAX_BATCH_SIZE emails, so a batch
+        costs a single request instead of one request (and one sleep) per recipient.
+        The HTML is encoded once per distinct recipient name, not once per email.
+        """
+        bodies = [self._encode_email(payload_prefix, recipient, html_content, encoded_html)
+                  for recipient in recipients]
+
+        self._wait_for_rate_limit()
+
+        try:
+            response = self.session.post(
+                self._batch_url,
+                data=b'[' + b','.join(bodies) + b']',
+                timeout=REQUEST_TIMEOUT
+            )
+        except Exception as e:
+            return [EmailResult(success=False, error_message=str(e), recipient_email=recipient.email)
+                    for recipient in recipients]
+
+        # A validation error rejects the whole batch; retry one email at a time
+        # so a single bad address only fails its own recipient
+        if response.status_code in (400, 422) and len(recipients) > 1:
+            logger.warning(f"⚠️ Batch rejected (HTTP {response.status_code}), sending {len(recipients)} emails individually")
+            return [self._send_single(body, recipient) for body, recipient in zip(bodies, recipients)]
+
+        # Resend answers 200 today, but any 2xx means the batch was accepted
+        if not 200 <= response.status_code < 300:
+            error_message = f"HTTP {response.status_code}: {response.text}"
+            return [EmailResult(success=False, error_message=error_message, recipient_email=recipient.email)
+                    for recipient in recipients]
+
+        # Resend returns one {"id": ...} per email, in request order
+        try:
+            sent = response.json().get("data") or []
+            if not isinstance(sent, list):
+                raise ValueError(f"expected a list of ids, got {type(sent).__name__}")
+        except (ValueError, AttributeError) as e:
+            error_message = f"Invalid response from Resend batch API: {e}"
+            return [EmailResult(success=False, error_message=error_message, recipient_email=recipient.email)
+                    for recipient in recipients]
+
         results = []
-        
-        for recipient in recipients:
-            try:
-                import requests
-                
-                payload = {
-                    "from": f"{self.sender_name} <{self.sender_email}>",
-                    "to": [recipient.email],
-                    "reply_to": [self.default_reply_to],
-                    "subject": subject,
-                    "html": html_content,
-                    "headers": {
-                        "X-Entity-ID": "newsletter",
-                        "List-Unsubscribe": f"<mailto:{self.sender_email}?subject=unsubscribe>",
-                        "List-ID": f"{self.sender_name} <newsletter.{self.sender_email.split('@')[1]}>",
-                        "Precedence": "bulk"
-                    }
-                }
-                
-                if text_content:
-                    payload["text"] = text_content
-                    
-                response = requests.post(
-                    "https://api.resend.com/emails",
-                    headers=self.headers,
-                    json=payload
-                )
-                
-                if response.status_code == 200:
-                    result_data = response.json()
-                    results.append(EmailResult(
-                        success=True,
-                        message_id=result_data.get("id"),
-                        recipient_email=recipient.email
-                    ))
-                else:
-                    results.append(EmailResult(
-                        success=False,
-                        error_message=f"HTTP {response.status_code}: {response.text}",
-                        recipient_email=recipient.email
-                    ))
-                    
-                # Rate limiting
-                import time
-                time.sleep(0.5)
-                
-            except Exception as e:
+        for idx, recipient in enumerate(recipients):
+            if idx < len(sent):
+                item = sent[idx]
+                results.append(EmailResult(
+                    success=True,
+                    message_id=item.get("id") if isinstance(item, dict) else None,
+                    recipient_email=recipient.email
+                ))
+            else:
                 results.append(EmailResult(
                     success=False,
-                    error_message=str(e),
+                    error_message="No message id returned by Resend batch API",
                     recipient_email=recipient.email
                 ))
-        
-        return results
\ No newline at end of file
+
+        return results
+
+    def _send_single(self, body, recipient):
+        """Send one already-encoded email through /emails; used when a batch fails validation"""
+        self._wait_for_rate_limit()
+
+        try:
+            response = self.session.post(
+                self._emails_url,
+                data=body,
+                timeout=REQUEST_TIMEOUT
+            )
+        except Exception as e:
+            return EmailResult(success=False, error_message=str(e), recipient_email=recipient.email)
+
+        if not 200 <= response.status_code < 300:
+            return EmailResult(success=False,
+                               error_message=f"HTTP {response.status_code}: {response.text}",
+                               recipient_email=recipient.email)
+
+        try:
+            message_id = response.json().get("id")
+        except (ValueError, AttributeError) as e:
+            return EmailResult(success=False,
+                               error_message=f"Invalid response from Resend API: {e}",
+                               recipient_email=recipient.email)
+        return EmailResult(success=True, message_id=message_id, recipient_email=recipient.email)
@@ -4,20 +4,38 @@ Standalone component that takes deals and creates professional summaries using O
 """
 
 import os
-from openai import OpenAI
 import logging
 from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import json
+import re
+import hashlib
 import time
-from datetime import datetime
-import requests
+import threading
+import atexit
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, defaultdict
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# System message shared by every summarization request
+SYSTEM_PROMPT = "You are a professional financial analyst specializing in investment banking, venture capital, and M&A. Provide concise, accurate summaries of financial deals for executive briefings."
+# Built once and reused as the first message of every request (never mutated)
+_SYSTEM_MESSAGE = {"role": "system", "content": SYSTEM_PROMPT}
 
-@dataclass
+# OpenAI Batch API polling (opt in with MA_USE_BATCH=1)
+BATCH_POLL_INTERVAL = 30  # seconds between status checks
+BATCH_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Parsed summaries are cached on disk by a hash of the deal text, so stories
+# that resurface on later runs don't cost another OpenAI call
+SUMMARY_CACHE_PATH = os.path.join('.ma_cache', 'summaries.json')
+SUMMARY_CACHE_TTL = 30 * 24 * 3600  # seconds an entry is kept
+
+
+@dataclass(slots=True, frozen=True)
 class Deal:
     """Deal data structure (matches ma_scraper.py)"""
     title: str
@@ -30,7 +48,7 @@ class Deal:
     priority_score: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class SummarizedDeal:
     """Enhanced deal with AI-generated summary"""
     title: str
@@ -47,6 +65,176 @@ class SummarizedDeal:
     sector: Optional[str] = None
 
 
+@dataclass(slots=True)
+class _DealStats:
+    """Per-newsletter aggregates, gathered in one pass over the deals"""
+    deals_by_type: Dict[str, List[SummarizedDeal]]
+    type_counts: Counter
+    sector_counts: Counter
+    total_amount_millions: float
+
+
+# Deal type display names for the headline and the executive summary
+_HEADLINE_TYPE_NAMES = {
+    'VC': 'Venture Capital',
+    'M&A': 'M&A',
+    'IPO': 'IPO',
+    'IB': 'Investment Banking'
+}
+_SUMMARY_TYPE_NAMES = {**_HEADLINE_TYPE_NAMES, 'IPO': 'Public Offering'}
+
+# Basic summaries used when AI summarization fails, by deal type
+_FALLBACK_SUMMARIES = {
+    'VC': "Venture capital investment to fuel company growth and expansion.",
+    'M&A': "Merger and acquisition transaction combining business operations.",
+    'IPO': "Initial public offering bringing company to public markets.",
+    'IB': "Investment banking transaction involving capital markets advisory."
+}
+_DEFAULT_FALLBACK_SUMMARY = "Significant financial transaction with market implications."
+
+# Deal amounts like "$2.3 billion", "$2.3B", "$500 million", "USD 50M";
+# longer unit spellings are tried first
+_AMOUNT_VALUE_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(billion|bn|b|million|mm|m)\b', re.IGNORECASE)
+_AMOUNT_SCALE = {'billion': 1000.0, 'bn': 1000.0, 'b': 1000.0, 'million': 1.0, 'mm': 1.0, 'm': 1.0}
+
+
+@lru_cache(maxsize=1024)
+def _amount_in_millions(amount: Optional[str]) -> float:
+    """
+    Numeric value of a deal amount in millions (0 when absent or unparseable)
+
+    Memoized: amount strings repeat heavily across deals ("$1 billion",
+    "$500 million"), so large runs parse each distinct string only once.
+    """
+    match = _AMOUNT_VALUE_RE.search(amount.replace(',', '')) if amount else None
+    if not match:
+        return 0.0
+    return float(match.group(1)) * _AMOUNT_SCALE[match.group(2).lower()]
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Structured-output schemas, so replies are guaranteed to be valid JSON in the
+# shape the prompts ask for (strict mode needs every field required)
+_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+        "companies": {"type": "array", "items": {"type": "string"}},
+        "sector": {"type": "string"}
+    },
+    "required": ["summary", "key_points", "companies", "sector"],
+    "additionalProperties": False
+}
+_MULTI_SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {"deals": {"type": "array", "items": _SUMMARY_SCHEMA}},
+    "required": ["deals"],
+    "additionalProperties": False
+}
+_SUMMARY_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "deal_summary", "schema": _SUMMARY_SCHEMA, "strict": True}
+}
+_MULTI_SUMMARY_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "deal_summaries", "schema": _MULTI_SUMMARY_SCHEMA, "strict": True}
+}
+
+# Section headings recognised when a reply isn't JSON ("Key Points:", "Sector: ...")
+_SECTION_KEYWORD_RE = re.compile(r'summary|points|companies|sector')
+_LIST_SECTIONS = frozenset({'key_points', 'companies'})
+
+
+# Prompt text that never changes goes first, byte-for-byte identical on every
+# call, so OpenAI's automatic prompt caching can reuse it; only the deal
+# details at the end vary
+_SUMMARY_REQUIREMENTS = """
+Requirements:
+- Summary should be 50-80 words, professional tone
+- Key points should be 3-4 bullet points covering: deal structure, strategic rationale, market impact, and financial details
+- Extract all company names mentioned
+- Identify the primary industry/sector
+- Focus on facts, avoid speculation
+- Use present tense for recent deals
+"""
+
+_SUMMARY_FIELDS = """{
+    "summary": "A concise 2-3 sentence summary highlighting the most important aspects of this deal",
+    "key_points": ["Point 1", "Point 2", "Point 3"],
+    "companies": ["Company 1", "Company 2"],
+    "sector": "Industry/Sector"
+}"""
+
+_SINGLE_DEAL_PROMPT_PREFIX = f"""
+Please analyze the financial deal below and provide a structured summary in JSON format.
+
+Please provide your response in the following JSON format:
+{_SUMMARY_FIELDS}
+{_SUMMARY_REQUIREMENTS}
+DEAL INFORMATION:
+"""
+
+_MULTI_DEAL_PROMPT_PREFIX = f"""
+Please analyze the numbered financial deals below and provide a structured summary of each in JSON format.
+
+Please provide your response as a JSON object whose "deals" array has exactly one entry per deal, in the order given, each in this format:
+{{"deals": [{_SUMMARY_FIELDS}]}}
+{_SUMMARY_REQUIREMENTS}
+DEALS:
+"""
+
+
+def _is_valid_summary(summary_data) -> bool:
+    """True if parsed summary data has the fields SummarizedDeal needs"""
+    return (isinstance(summary_data, dict)
+            and isinstance(summary_data.get('summary'), str) and bool(summary_data['summary'].strip())
+            and isinstance(summary_data.get('key_points'), list))
+
+
+def _is_usable_cache_entry(entry, now: float) -> bool:
+    """True if a summary cache entry is unexpired and holds a valid summary"""
+    return (isinstance(entry, dict)
+            and isinstance(entry.get('cached_at'), (int, float))
+            and now - entry['cached_at'] < SUMMARY_CACHE_TTL
+            and _is_valid_summary(entry.get('data')))
+
+
+def _format_deal_information(deal: Deal) -> str:
+    """The per-deal part of a summarization prompt"""
+    return f"""Title: {deal.title}
+Description: {deal.description}
+Deal Type: {deal.deal_type}
+Amount: {deal.amount or 'Not specified'}
+Source: {deal.source}
+Date: {deal.date}
+"""
+
+
+@lru_cache(maxsize=4)
+def _get_openai_client(api_key: str, max_connections: int):
+    """
+    OpenAI client shared by every DealSummarizer using the same key
+
+    One keep-alive pool sized to the worker count, and timeouts that fail a
+    stalled call in a minute instead of the SDK's ten, so the fallback summary
+    kicks in. The SDK is imported here so a missing key fails before paying
+    for the import; the pool is closed at interpreter exit.
+    """
+    import httpx
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=max_connections,
+                            max_keepalive_connections=max_connections),
+        transport=httpx.HTTPTransport(retries=2)
+    )
+    atexit.register(http_client.close)
+    return OpenAI(api_key=api_key, http_client=http_client)
+
+
 class DealSummarizer:
     """AI-powered deal summarizer using OpenAI"""
 
@@ -65,19 +253,36 @@ class DealSummarizer:
             raise ValueError(
                 "OpenAI API key not provided. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
 
-        # Configure OpenAI client
-        self.client = OpenAI(api_key=self.api_key)
-
         # Summarization settings
-        self.model = "gpt-4"  # Use gpt-3.5-turbo for cost efficiency if needed
+        self.model = os.getenv('MA_SUMMARY_MODEL', 'gpt-4o-mini')
         self.max_tokens = 300
         self.temperature = 0.3  # Lower temperature for more consistent, factual summaries
+        # JSON-schema structured outputs; set MA_STRUCTURED_OUTPUT=0 for models without them
+        self.structured_output = os.getenv('MA_STRUCTURED_OUTPUT', '1') == '1'
 
-        # Rate limiting
+        # Summary cache (key -> {"data": parsed summary, "cached_at": epoch seconds})
+        self.cache_path = os.getenv('MA_SUMMARY_CACHE', SUMMARY_CACHE_PATH)
+        self._summary_cache = self._load_summary_cache()
+        self._cache_lock = threading.Lock()
+
+        # Batch API: half the cost, results within the completion window
+        self.use_batch = os.getenv('MA_USE_BATCH') == '1'
+        self.batch_timeout = int(os.getenv('MA_BATCH_TIMEOUT', '3600'))
+
+        # Deals packed into one chat request (1 = a request per deal)
+        self.deals_per_request = max(1, int(os.getenv('MA_DEALS_PER_REQUEST', '8')))
+
+        # Concurrency and rate limiting
+        self.max_concurrency = max(1, int(os.getenv('SUMMARIZER_CONCURRENCY', '8')))
+        self._rate_lock = threading.Lock()
         self.requests_per_minute = 50
-        self.last_request_time = 0
-        self.request_count = 0
-        self.minute_start = time.time()
+        # Token bucket: starts full, refills at requests_per_minute / 60 per second
+        self._tokens = float(self.requests_per_minute)
+        self._tokens_updated = time.monotonic()
+
+        # Shared OpenAI client, so every summarizer in this process reuses one
+        # connection pool
+        self.client = _get_openai_client(self.api_key, self.max_concurrency)
 
         logger.info("✅ Deal Summarizer initialized successfully")
 
@@ -93,126 +298,364 @@ class DealSummarizer:
         """
         logger.info(f"📝 Starting summarization for {len(deals)} deals...")
 
+        if self.use_batch and deals:
+            try:
+                summarized_deals = self.summarize_deals_batch(deals)
+                self._save_summary_cache()
+                return summarized_deals
+            except Exception as e:
+                logger.error(f"❌ Batch summarization failed, falling back to realtime requests: {e}")
+
+        # Deals are packed several to a request so the system prompt and round-trip
+        # are paid once per chunk; chunks are network-bound and run concurrently,
+        # held back only by the shared requests_per_minute limiter
+        total = len(deals)
+        items = list(enumerate(deals, 1))
+        chunks = [items[start:start + self.deals_per_request]
+                  for start in range(0, total, self.deals_per_request)]
         summarized_deals = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(chunks)))) as pool:
+            for chunk_results in pool.map(lambda chunk: self._summarize_chunk(chunk, total), chunks):
+                summarized_deals.extend(chunk_results)
+
+        self._save_summary_cache()
+        logger.info(f"✅ Summarization complete: {len(summarized_deals)} deals processed")
+        return summarized_deals
+
+    def _summarize_chunk(self, items: List[tuple], total: int) -> List[SummarizedDeal]:
+        """
+        Summarize numbered deals with a single request where possible
 
-        for i, deal in enumerate(deals, 1):
-            logger.info(f"🔄 Processing deal {i}/{len(deals)}: {deal.title[:50]}...")
+        Cached deals are reused; the rest go out in one multi-deal request, and
+        if that fails or returns the wrong number of summaries, each deal is
+        retried on its own.
 
+        Args:
+            items: (position, Deal) pairs, positions counting from 1
+            total: Total number of deals in this run (for logging)
+
+        Returns:
+            SummarizedDeal objects in the same order as items
+        """
+        results = {}
+        pending = []
+        for i, deal in items:
+            cached = self._summary_from_cache(deal)
+            if cached is not None:
+                logger.info(f"♻️ Deal {i} summary reused from cache")
+                results[i] = cached
+            else:
+                pending.append((i, deal))
+
+        if len(pending) > 1:
+            first, last = pending[0][0], pending[-1][0]
+            logger.info(f"🔄 Processing deals {first}-{last}/{total} in one request...")
             try:
-                # Rate limiting
                 self._handle_rate_limiting()
+                summaries = self._summarize_deal_batch([deal for _, deal in pending])
+                for (i, _), summarized_deal in zip(pending, summaries):
+                    results[i] = summarized_deal
+                logger.info(f"✅ Deals {first}-{last} summarized successfully")
+                pending = []
+            except Exception as e:
+                logger.warning(f"⚠️ Multi-deal request failed, summarizing deals {first}-{last} one by one: {e}")
 
-                # Generate summary
-                summarized_deal = self._summarize_single_deal(deal)
-                summarized_deals.append(summarized_deal)
+        for i, deal in pending:
+            results[i] = self._summarize_with_fallback(i, deal, total)
 
-                logger.info(f"✅ Deal {i} summarized successfully")
+        return [results[i] for i, _ in items]
 
-            except Exception as e:
-                logger.error(f"❌ Error summarizing deal {i}: {e}")
-                # Create fallback summary
-                fallback_summary = self._create_fallback_summary(deal)
-                summarized_deals.append(fallback_summary)
+    def _summarize_with_fallback(self, i: int, deal: Deal, total: int) -> SummarizedDeal:
+        """Summarize one deal, falling back to a basic summary if OpenAI fails"""
+        logger.info(f"🔄 Processing deal {i}/{total}: {deal.title[:50]}...")
 
-        logger.info(f"✅ Summarization complete: {len(summarized_deals)} deals processed")
-        return summarized_deals
+        cached = self._summary_from_cache(deal)
+        if cached is not None:
+            logger.info(f"♻️ Deal {i} summary reused from cache")
+            return cached
+
+        try:
+            # Rate limiting
+            self._handle_rate_limiting()
+
+            # Generate summary
+            summarized_deal = self._summarize_single_deal(deal)
+            logger.info(f"✅ Deal {i} summarized successfully")
+            return summarized_deal
+
+        except Exception as e:
+            logger.error(f"❌ Error summarizing deal {i}: {e}")
+            # Create fallback summary
+            return self._create_fallback_summary(deal)
 
     def _summarize_single_deal(self, deal: Deal) -> SummarizedDeal:
         """Summarize a single deal using OpenAI"""
 
-        # Create prompt for summarization
-        prompt = self._create_summarization_prompt(deal)
-
         try:
             # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a professional financial analyst specializing in investment banking, venture capital, and M&A. Provide concise, accurate summaries of financial deals for executive briefings."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                top_p=0.9
-            )
+            response = self.client.chat.completions.create(**self._chat_request(deal))
 
             # Parse response
             ai_response = response.choices[0].message.content.strip()
             summary_data = self._parse_ai_response(ai_response)
-
-            # Create SummarizedDeal object
-            summarized_deal = SummarizedDeal(
-                title=deal.title,
-                description=deal.description,
-                ai_summary=summary_data['summary'],
-                key_points=summary_data['key_points'],
-                source=deal.source,
-                url=deal.url,
-                date=deal.date,
-                deal_type=deal.deal_type,
-                amount=deal.amount,
-                priority_score=deal.priority_score,
-                companies_involved=summary_data.get('companies', []),
-                sector=summary_data.get('sector')
-            )
-
+            if not _is_valid_summary(summary_data):
+                raise ValueError("AI response is missing summary or key_points")
+            summarized_deal = self._build_summarized_deal(deal, summary_data)
+            self._cache_summary(deal, summary_data)
             return summarized_deal
 
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
             raise
 
-    def _create_summarization_prompt(self, deal: Deal) -> str:
-        """Create a structured prompt for deal summarization"""
+    def _summarize_deal_batch(self, deals: List[Deal]) -> List[SummarizedDeal]:
+        """
+        Summarize several deals with one OpenAI request
 
-        prompt = f"""
-Please analyze this financial deal and provide a structured summary in JSON format:
+        Raises ValueError unless the reply holds exactly one summary per deal,
+        so the caller can fall back to per-deal requests.
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": self._create_multi_deal_prompt(deals)}
+            ],
+            max_tokens=self.max_tokens * len(deals),
+            temperature=self.temperature,
+            top_p=0.9,
+            **self._response_format(_MULTI_SUMMARY_RESPONSE_FORMAT)
+        )
 
-DEAL INFORMATION:
-Title: {deal.title}
-Description: {deal.description}
-Deal Type: {deal.deal_type}
-Amount: {deal.amount or 'Not specified'}
-Source: {deal.source}
-Date: {deal.date}
+        ai_response = response.choices[0].message.content.strip()
+        start = ai_response.find('{')
+        if start == -1:
+            raise ValueError("reply holds no JSON object")
+        data, _ = _JSON_DECODER.raw_decode(ai_response, start)
+        entries = data.get('deals') if isinstance(data, dict) else None
+        if not isinstance(entries, list) or len(entries) != len(deals):
+            raise ValueError(f"expected {len(deals)} summaries, got "
+                             f"{len(entries) if isinstance(entries, list) else 'none'}")
 
-Please provide your response in the following JSON format:
-{{
-    "summary": "A concise 2-3 sentence summary highlighting the most important aspects of this deal",
-    "key_points": ["Point 1", "Point 2", "Point 3"],
-    "companies": ["Company 1", "Company 2"],
-    "sector": "Industry/Sector"
-}}
+        summarized_deals = []
+        for deal, entry in zip(deals, entries):
+            if not isinstance(entry, dict):
+                raise ValueError("summary missing for a deal")
+            summary_data = {
+                'summary': entry.get('summary'),
+                'key_points': entry.get('key_points') or [],
+                'companies': entry.get('companies') or [],
+                'sector': entry.get('sector')
+            }
+            if not _is_valid_summary(summary_data):
+                raise ValueError("summary missing for a deal")
+            self._cache_summary(deal, summary_data)
+            summarized_deals.append(self._build_summarized_deal(deal, summary_data))
+        return summarized_deals
 
-Requirements:
-- Summary should be 50-80 words, professional tone
-- Key points should be 3-4 bullet points covering: deal structure, strategic rationale, market impact, and financial details
-- Extract all company names mentioned
-- Identify the primary industry/sector
-- Focus on facts, avoid speculation
-- Use present tense for recent deals
-"""
+    def _chat_request(self, deal: Deal) -> Dict:
+        """Chat completion parameters for summarizing one deal (realtime or batch)"""
+        return {
+            "model": self.model,
+            "messages": [
+                _SYSTEM_MESSAGE,
+                {"role": "user", "content": self._create_summarization_prompt(deal)}
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": 0.9,
+            **self._response_format(_SUMMARY_RESPONSE_FORMAT)
+        }
 
-        return prompt
+    def _response_format(self, response_format: Dict) -> Dict:
+        """response_format keyword for a strict JSON schema, or nothing when disabled"""
+        return {"response_format": response_format} if self.structured_output else {}
 
-    def _parse_ai_response(self, response: str) -> Dict:
-        """Parse OpenAI response and extract structured data"""
+    def _build_summarized_deal(self, deal: Deal, summary_data: Dict) -> SummarizedDeal:
+        """Combine a deal with its parsed AI summary"""
+        return SummarizedDeal(
+            title=deal.title,
+            description=deal.description,
+            ai_summary=summary_data['summary'],
+            key_points=summary_data['key_points'],
+            source=deal.source,
+            url=deal.url,
+            date=deal.date,
+            deal_type=deal.deal_type,
+            amount=deal.amount,
+            priority_score=deal.priority_score,
+            companies_involved=summary_data.get('companies', []),
+            sector=summary_data.get('sector')
+        )
+
+    def summarize_deals_batch(self, deals: List[Deal]) -> List[SummarizedDeal]:
+        """
+        Summarize deals through the OpenAI Batch API
+
+        Uploads one chat completion request per deal, waits for the batch to
+        finish (up to batch_timeout seconds) and maps the results back by
+        custom_id. Deals whose request failed get the fallback summary.
 
+        Args:
+            deals: List of Deal objects to summarize
+
+        Returns:
+            List of SummarizedDeal objects, in the same order as deals
+        """
+        cached = {i: summarized for i, deal in enumerate(deals)
+                  if (summarized := self._summary_from_cache(deal)) is not None}
+        if len(cached) == len(deals):
+            logger.info("♻️ All deal summaries reused from cache")
+            return [cached[i] for i in range(len(deals))]
+
+        logger.info(f"📦 Submitting {len(deals) - len(cached)} deals to the OpenAI Batch API "
+                    f"({len(cached)} reused from cache)...")
+
+        lines = [
+            json.dumps({
+                "custom_id": f"deal-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._chat_request(deal)
+            })
+            for i, deal in enumerate(deals) if i not in cached
+        ]
+        input_file = self.client.files.create(
+            file=("deals.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+        deadline = time.time() + self.batch_timeout
+        while batch.status not in BATCH_TERMINAL_STATUSES:
+            if time.time() >= deadline:
+                self.client.batches.cancel(batch.id)
+                raise TimeoutError(f"batch {batch.id} still {batch.status} after {self.batch_timeout}s")
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"batch {batch.id} ended with status {batch.status}")
+
+        # Output lines come back in any order; index the message text by custom_id
+        contents = {}
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                contents[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+        summarized_deals = []
+        for i, deal in enumerate(deals):
+            if i in cached:
+                summarized_deals.append(cached[i])
+                continue
+            content = contents.get(f"deal-{i}")
+            if content is None:
+                logger.error(f"❌ No batch result for deal {i + 1}: {deal.title[:50]}")
+                summarized_deals.append(self._create_fallback_summary(deal))
+                continue
+            summary_data = self._parse_ai_response(content.strip())
+            if not _is_valid_summary(summary_data):
+                logger.error(f"❌ Incomplete batch result for deal {i + 1}: {deal.title[:50]}")
+                summarized_deals.append(self._create_fallback_summary(deal))
+                continue
+            self._cache_summary(deal, summary_data)
+            summarized_deals.append(self._build_summarized_deal(deal, summary_data))
+
+        logger.info(f"✅ Batch summarization complete: {len(contents)}/{len(lines)} deals summarized")
+        return summarized_deals
+
+    def _summary_cache_key(self, deal: Deal) -> str:
+        """Hash of the model and the deal's normalized title and description"""
+        text = f"{self.model}\n{' '.join(deal.title.lower().split())}\n{' '.join(deal.description.lower().split())}"
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def _cached_summary(self, deal: Deal) -> Optional[Dict]:
+        """Parsed summary for this deal from an earlier call, if still fresh and complete"""
+        entry = self._summary_cache.get(self._summary_cache_key(deal))
+        if _is_usable_cache_entry(entry, time.time()):
+            return entry['data']
+        return None
+
+    def _summary_from_cache(self, deal: Deal) -> Optional[SummarizedDeal]:
+        """SummarizedDeal built from the cache, or None on a miss or an unusable entry"""
+        cached = self._cached_summary(deal)
+        if cached is None:
+            return None
         try:
-            # Try to parse as JSON
-            if response.strip().startswith('{'):
-                return json.loads(response)
+            return self._build_summarized_deal(deal, cached)
+        except Exception as e:
+            logger.warning(f"⚠️ Ignoring bad cached summary for {deal.title[:50]}: {e}")
+            return None
+
+    def _cache_summary(self, deal: Deal, summary_data: Dict):
+        """Remember a parsed summary (safe to call from worker threads)"""
+        with self._cache_lock:
+            self._summary_cache[self._summary_cache_key(deal)] = {
+                'data': summary_data,
+                'cached_at': time.time()
+            }
+
+    def _load_summary_cache(self) -> Dict:
+        """Load the on-disk summary cache, dropping expired or incomplete entries"""
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable summary cache {self.cache_path}: {e}")
+            return {}
+
+        if not isinstance(cache, dict):
+            logger.warning(f"⚠️ Ignoring malformed summary cache {self.cache_path}")
+            return {}
+
+        now = time.time()
+        return {key: entry for key, entry in cache.items() if _is_usable_cache_entry(entry, now)}
+
+    def _save_summary_cache(self):
+        """Write the summary cache to disk; a failed write only costs future cache hits"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._summary_cache, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save summary cache to {self.cache_path}: {e}")
+
+    def _create_summarization_prompt(self, deal: Deal) -> str:
+        """Create a structured prompt for deal summarization"""
+        return _SINGLE_DEAL_PROMPT_PREFIX + _format_deal_information(deal)
+
+    def _create_multi_deal_prompt(self, deals: List[Deal]) -> str:
+        """Create a structured prompt that summarizes several numbered deals at once"""
+        deal_blocks = "\n".join(
+            f"[[{n}]]\n{_format_deal_information(deal)}" for n, deal in enumerate(deals, 1)
+        )
+        return f"{_MULTI_DEAL_PROMPT_PREFIX}Number of deals: {len(deals)}\n\n{deal_blocks}"
+
+    def _parse_ai_response(self, response: str) -> Dict:
+        """Parse OpenAI response and extract structured data"""
 
-            # If not JSON, extract manually
+        # Decode the JSON object in a single pass straight from its opening
+        # brace, which also copes with a ```json fence or a line of preamble
+        start = response.find('{')
+        if start == -1:
             logger.warning("AI response not in JSON format, parsing manually...")
             return self._manual_parse_response(response)
 
+        try:
+            data, _ = _JSON_DECODER.raw_decode(response, start)
+            return data
         except json.JSONDecodeError:
             logger.warning("Failed to parse JSON response, using manual parsing...")
             return self._manual_parse_response(response)
@@ -237,24 +680,23 @@ Requirements:
             if not line:
                 continue
 
-            # Identify sections
-            if 'summary' in line.lower() and ':' in line:
+            # Identify sections: one regex scan finds every section keyword on the line
+            keywords = set(_SECTION_KEYWORD_RE.findall(line.lower()))
+            if 'summary' in keywords and ':' in line:
                 current_section = 'summary'
                 result['summary'] = line.split(':', 1)[1].strip()
-            elif 'key points' in line.lower() or 'points' in line.lower():
+            elif 'points' in keywords:
                 current_section = 'key_points'
-            elif 'companies' in line.lower():
+            elif 'companies' in keywords:
                 current_section = 'companies'
-            elif 'sector' in line.lower():
+            elif 'sector' in keywords:
                 current_section = 'sector'
                 if ':' in line:
                     result['sector'] = line.split(':', 1)[1].strip()
 
-            # Add content to current section
-            elif current_section == 'key_points' and (line.startswith('-') or line.startswith('•')):
-                result['key_points'].append(line[1:].strip())
-            elif current_section == 'companies' and (line.startswith('-') or line.startswith('•')):
-                result['companies'].append(line[1:].strip())
+            # Add bullets to the current list section
+            elif current_section in _LIST_SECTIONS and line[0] in '-•':
+                result[current_section].append(line[1:].strip())
 
         # Fallback summary if empty
         if not result['summary']:
@@ -268,15 +710,7 @@ Requirements:
         logger.info("Creating fallback summary...")
 
         # Basic summary based on deal type
-        deal_type_summaries = {
-            'VC': f"Venture capital investment to fuel company growth and expansion.",
-            'M&A': f"Merger and acquisition transaction combining business operations.",
-            'IPO': f"Initial public offering bringing company to public markets.",
-            'IB': f"Investment banking transaction involving capital markets advisory."
-        }
-
-        fallback_summary = deal_type_summaries.get(deal.deal_type,
-                                                   "Significant financial transaction with market implications.")
+        fallback_summary = _FALLBACK_SUMMARIES.get(deal.deal_type, _DEFAULT_FALLBACK_SUMMARY)
 
         # Add amount if available
         if deal.amount:
@@ -308,30 +742,32 @@ Requirements:
         )
 
     def _handle_rate_limiting(self):
-        """Handle OpenAI API rate limiting"""
+        """Handle OpenAI API rate limiting (safe to call from worker threads)"""
+        with self._rate_lock:
+            sleep_time = self._reserve_request_slot()
 
-        current_time = time.time()
+        # Sleep outside the lock so other workers can reserve their own slots
+        # (and queue up behind this one) instead of blocking on the lock
+        if sleep_time > 0:
+            logger.info(f"⏳ Rate limit reached, sleeping for {sleep_time:.1f} seconds...")
+            time.sleep(sleep_time)
 
-        # Reset counter every minute
-        if current_time - self.minute_start >= 60:
-            self.request_count = 0
-            self.minute_start = current_time
-
-        # Check if we're at the limit
-        if self.request_count >= self.requests_per_minute:
-            sleep_time = 60 - (current_time - self.minute_start)
-            if sleep_time > 0:
-                logger.info(f"⏳ Rate limit reached, sleeping for {sleep_time:.1f} seconds...")
-                time.sleep(sleep_time)
-                self.request_count = 0
-                self.minute_start = time.time()
+    def _reserve_request_slot(self) -> float:
+        """
+        Take a token from the bucket and return how long to wait before using it
 
-        # Add small delay between requests
-        if current_time - self.last_request_time < 1.2:  # Min 1.2 seconds between requests
-            time.sleep(1.2 - (current_time - self.last_request_time))
+        The bucket may go negative: each waiting request reserves the next
+        token to be refilled, so waits queue up in arrival order. Caller
+        holds _rate_lock.
+        """
+        rate = self.requests_per_minute / 60.0
+        now = time.monotonic()
+        self._tokens = min(float(self.requests_per_minute),
+                           self._tokens + (now - self._tokens_updated) * rate)
+        self._tokens_updated = now
 
-        self.request_count += 1
-        self.last_request_time = time.time()
+        self._tokens -= 1
+        return -self._tokens / rate if self._tokens < 0 else 0.0
 
     def create_newsletter_content(self, summarized_deals: List[SummarizedDeal]) -> Dict[str, str]:
         """
@@ -345,81 +781,66 @@ Requirements:
         """
         logger.info("📰 Creating newsletter content...")
 
-        # Group deals by type
-        deals_by_type = {}
-        for deal in summarized_deals:
-            if deal.deal_type not in deals_by_type:
-                deals_by_type[deal.deal_type] = []
-            deals_by_type[deal.deal_type].append(deal)
+        # Group and count everything in one pass over the deals
+        stats = self._aggregate(summarized_deals)
 
         # Create newsletter sections
         newsletter_content = {
-            'headline': self._create_headline(summarized_deals),
-            'executive_summary': self._create_executive_summary(summarized_deals),
+            'headline': self._create_headline(summarized_deals, stats),
+            'executive_summary': self._create_executive_summary(summarized_deals, stats),
             'deal_sections': {},
-            'market_insights': self._create_market_insights(summarized_deals)
+            'market_insights': self._create_market_insights(summarized_deals, stats)
         }
 
         # Create sections for each deal type
-        for deal_type, deals in deals_by_type.items():
+        for deal_type, deals in stats.deals_by_type.items():
             newsletter_content['deal_sections'][deal_type] = self._create_deal_section(deal_type, deals)
 
         logger.info("✅ Newsletter content created successfully")
         return newsletter_content
 
-    def _create_headline(self, deals: List[SummarizedDeal]) -> str:
+    @staticmethod
+    def _aggregate(deals: List[SummarizedDeal]) -> _DealStats:
+        """Group deals by type and tally types, sectors and disclosed value (in millions)"""
+        deals_by_type = defaultdict(list)
+        sector_counts = Counter()
+        total_amount = 0.0
+
+        for deal in deals:
+            deals_by_type[deal.deal_type].append(deal)
+            if deal.sector:
+                sector_counts[deal.sector] += 1
+            total_amount += _amount_in_millions(deal.amount)
+
+        type_counts = Counter({deal_type: len(group) for deal_type, group in deals_by_type.items()})
+        return _DealStats(dict(deals_by_type), type_counts, sector_counts, total_amount)
+
+    def _create_headline(self, deals: List[SummarizedDeal], stats: Optional[_DealStats] = None) -> str:
         """Create newsletter headline"""
 
+        type_counts = (stats or self._aggregate(deals)).type_counts
         total_deals = len(deals)
-        deal_types = list(set(deal.deal_type for deal in deals))
         
         # Create more inclusive headlines
-        if len(deal_types) == 1:
-            deal_type_names = {
-                'VC': 'Venture Capital',
-                'M&A': 'M&A',
-                'IPO': 'IPO',
-                'IB': 'Investment Banking'
-            }
-            deal_name = deal_type_names.get(deal_types[0], deal_types[0])
+        if len(type_counts) == 1:
+            deal_type = next(iter(type_counts))
+            deal_name = _HEADLINE_TYPE_NAMES.get(deal_type, deal_type)
             return f"Top {total_deals} {deal_name} Deals This Week"
         else:
             return f"Weekly Financial Markets Roundup: {total_deals} Key Deals Across Multiple Sectors"
 
-    def _create_executive_summary(self, deals: List[SummarizedDeal]) -> str:
+    def _create_executive_summary(self, deals: List[SummarizedDeal], stats: Optional[_DealStats] = None) -> str:
         """Create executive summary"""
 
+        stats = stats or self._aggregate(deals)
         total_deals = len(deals)
-        deal_types = {}
-        total_amount = 0
-
-        for deal in deals:
-            deal_types[deal.deal_type] = deal_types.get(deal.deal_type, 0) + 1
-
-            # Try to extract numeric amount for total
-            if deal.amount:
-                try:
-                    amount_str = deal.amount.replace('$', '').replace(',', '')
-                    if 'billion' in amount_str.lower():
-                        num = float(amount_str.split()[0])
-                        total_amount += num * 1000  # Convert to millions
-                    elif 'million' in amount_str.lower():
-                        num = float(amount_str.split()[0])
-                        total_amount += num
-                except:
-                    pass
+        deal_types = stats.type_counts
+        total_amount = stats.total_amount_millions
 
         # Create more inclusive language
-        deal_type_names = {
-            'VC': 'Venture Capital',
-            'M&A': 'M&A',
-            'IPO': 'Public Offering',
-            'IB': 'Investment Banking'
-        }
-        
         deal_descriptions = []
         for deal_type, count in deal_types.items():
-            type_name = deal_type_names.get(deal_type, deal_type)
+            type_name = _SUMMARY_TYPE_NAMES.get(deal_type, deal_type)
             deal_descriptions.append(f"{count} {type_name}")
         
         summary = f"This week we tracked {total_deals} significant financial transactions across "
@@ -458,18 +879,16 @@ Requirements:
 
         return section_deals
 
-    def _create_market_insights(self, deals: List[SummarizedDeal]) -> str:
+    def _create_market_insights(self, deals: List[SummarizedDeal], stats: Optional[_DealStats] = None) -> str:
         """Create market insights section"""
 
-        sectors = {}
-        for deal in deals:
-            if deal.sector:
-                sectors[deal.sector] = sectors.get(deal.sector, 0) + 1
+        sectors = (stats or self._aggregate(deals)).sector_counts
 
         if sectors:
-            top_sector = max(sectors, key=sectors.get)
+            # most_common keeps first-seen order among ties, as max() did
+            top_sector, top_count = sectors.most_common(1)[0]
             insights = f"This week showed particularly strong activity in {top_sector} "
-            insights += f"with {sectors[top_sector]} deals. "
+            insights += f"with {top_count} deals. "
 
             if len(sectors) > 1:
                 other_sectors = [s for s in sectors.keys() if s != top_sector]
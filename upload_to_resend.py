@@ -8,7 +8,6 @@ import logging
 import sys
 import os
 from dotenv import load_dotenv
-from ma_resend_sync import sync_subscribers
 
 # Load environment variables
 load_dotenv()
@@ -33,6 +32,10 @@ def main():
             logger.error(f"❌ Missing required environment variables: {missing_vars}")
             sys.exit(1)
         
+        # Imported only once the environment checks pass; this pulls in the
+        # Supabase and Resend clients
+        from ma_resend_sync import sync_subscribers
+
         # Perform sync
         results = sync_subscribers()
         